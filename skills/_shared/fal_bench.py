@@ -0,0 +1,234 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.10"
+# dependencies = ["requests"]
+# ///
+
+"""
+Benchmarks for fal_client.py and video-gen.py against the local FAL stub.
+
+Starts fal_stub_server.py in-process and reports:
+- status requests/sec over the pooled session
+- time-to-detect-completion for queue_wait (streaming and polling)
+- upload and download throughput (MB/s)
+- end-to-end wall time of the video-gen CLI
+
+Usage:
+    uv run skills/_shared/fal_bench.py
+    uv run skills/_shared/fal_bench.py --only status,detect --json bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+from fal_client import FalClient, PollSchedule
+from fal_stub_server import StubConfig, StubServer, start_stub_server
+
+CURRENT_DIR = pathlib.Path(__file__).resolve().parent
+VIDEO_GEN_SCRIPT = CURRENT_DIR.parent / "video-gen" / "video-gen.py"
+MODEL_PATH = "fal-ai/veo3.1"
+MB = 1024 * 1024
+
+BENCHMARKS = ("status", "detect", "upload", "download", "cli")
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _client(server: StubServer) -> FalClient:
+    # No caches, journal or rate limiter: measure the transport, not local state.
+    return FalClient(api_key="bench", base_url=server.base_url)
+
+
+def bench_status(server: StubServer, args: argparse.Namespace) -> dict[str, Any]:
+    with _client(server) as client:
+        request_id = client.queue_submit(MODEL_PATH, {"prompt": "bench"})["request_id"]
+        latencies: list[float] = []
+
+        def worker(count: int) -> None:
+            for _ in range(count):
+                started = time.perf_counter()
+                client.queue_status(MODEL_PATH, request_id)
+                latencies.append(time.perf_counter() - started)
+
+        per_thread = max(1, args.requests // args.threads)
+        started = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(worker, [per_thread] * args.threads))
+        elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "threads": args.threads,
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def bench_detect(server: StubServer, args: argparse.Namespace) -> dict[str, Any]:
+    """Delay between the stub marking a job COMPLETED and queue_wait returning."""
+    results: dict[str, Any] = {}
+    schedule = PollSchedule(queued_interval=args.poll_interval)
+    for mode, stream in (("stream", True), ("poll", False)):
+        lags: list[float] = []
+        calls: list[int] = []
+        with _client(server) as client:
+            for _ in range(args.jobs):
+                request_id = client.queue_submit(MODEL_PATH, {"prompt": "bench"})["request_id"]
+                polls: list[int] = [0]
+
+                def on_status(_status: str, payload: Any, _elapsed: int, polls: list[int] = polls) -> None:
+                    polls[0] = payload["poll"]["calls"]
+
+                final = client.queue_wait(
+                    MODEL_PATH, request_id, poll_schedule=schedule, on_status=on_status, stream=stream
+                )
+                lags.append(max(0.0, time.time() - float(final.get("completed_at", time.time()))))
+                calls.append(polls[0])
+        results[mode] = {
+            "jobs": len(lags),
+            "mean_lag_ms": round(statistics.mean(lags) * 1000, 1),
+            "p90_lag_ms": round(_percentile(lags, 90) * 1000, 1),
+            "mean_status_calls": round(statistics.mean(calls), 1),
+        }
+    return results
+
+
+def bench_upload(server: StubServer, args: argparse.Namespace, workdir: pathlib.Path) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    source = workdir / "upload.bin"
+    with source.open("wb") as handle:
+        handle.write(os.urandom(int(args.upload_mb * MB)))
+    size = source.stat().st_size
+    with _client(server) as client:
+        for mode, threshold in (("single", size + 1), ("chunked", 1)):
+            client.chunked_upload_threshold = threshold
+            started = time.perf_counter()
+            client.upload_file(str(source), use_cache=False)
+            elapsed = time.perf_counter() - started
+            results[mode] = {"mb": round(size / MB, 1), "seconds": round(elapsed, 3), "mb_per_second": round(size / MB / elapsed, 1)}
+    return results
+
+
+def bench_download(server: StubServer, args: argparse.Namespace, workdir: pathlib.Path) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    url = f"{server.base_url}/media/bench.mp4"
+    size = server.state.config.media_bytes
+    with _client(server) as client:
+        for connections in sorted({1, args.connections}):
+            output = workdir / f"download-{connections}.mp4"
+            started = time.perf_counter()
+            client.download_to_file(url, str(output), connections=connections)
+            elapsed = time.perf_counter() - started
+            output.unlink()
+            results[f"connections_{connections}"] = {
+                "mb": round(size / MB, 1),
+                "seconds": round(elapsed, 3),
+                "mb_per_second": round(size / MB / elapsed, 1),
+            }
+    return results
+
+
+def bench_cli(server: StubServer, args: argparse.Namespace, workdir: pathlib.Path) -> dict[str, Any]:
+    env = {
+        **os.environ,
+        "MAX_API_KEY": "bench",
+        "MAX_API_BASE_URL": server.base_url,
+        "MAX_FAL_CACHE_DIR": str(workdir / "cache"),
+        # A running daemon would serve these calls with its own base URL, i.e. not the stub.
+        "MAX_FAL_DAEMON": "0",
+    }
+    command = [sys.executable, str(VIDEO_GEN_SCRIPT), "--prompt", "bench", "--output-dir", str(workdir / "out")]
+    job_seconds = server.state.config.queue_seconds + server.state.config.run_seconds
+    walls: list[float] = []
+    for _ in range(args.cli_runs):
+        started = time.perf_counter()
+        completed = subprocess.run(command, env=env, capture_output=True, text=True, check=False)
+        walls.append(time.perf_counter() - started)
+        if completed.returncode != 0:
+            raise RuntimeError(f"video-gen failed: {completed.stdout}{completed.stderr}")
+    return {
+        "runs": len(walls),
+        "mean_seconds": round(statistics.mean(walls), 3),
+        "min_seconds": round(min(walls), 3),
+        "overhead_seconds": round(statistics.mean(walls) - job_seconds, 3),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the shared FAL client against a local stub")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"Comma list of: {','.join(BENCHMARKS)}")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub latency added per API response (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stub 503 injection rate")
+    parser.add_argument("--queue-seconds", type=float, default=0.5, help="Stub time IN_QUEUE per job")
+    parser.add_argument("--run-seconds", type=float, default=1.0, help="Stub time IN_PROGRESS per job")
+    parser.add_argument("--requests", type=int, default=2000, help="Status requests for the requests/sec run")
+    parser.add_argument("--threads", type=int, default=8, help="Threads for the requests/sec run")
+    parser.add_argument("--jobs", type=int, default=5, help="Jobs per mode for time-to-detect-completion")
+    parser.add_argument("--poll-interval", type=float, default=3, help="Base polling interval for detect runs")
+    parser.add_argument("--upload-mb", type=float, default=32, help="Upload file size in MB")
+    parser.add_argument("--media-mb", type=float, default=64, help="Download size in MB")
+    parser.add_argument("--connections", type=int, default=4, help="Parallel connections for ranged download")
+    parser.add_argument("--cli-runs", type=int, default=3, help="video-gen invocations to time")
+    parser.add_argument("--json", default="", help="Also write results to this JSON file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    config = StubConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        queue_seconds=args.queue_seconds,
+        run_seconds=args.run_seconds,
+        media_bytes=int(args.media_mb * MB),
+    )
+    server = start_stub_server(config)
+    print(f"[Bench] Stub listening on {server.base_url}")
+    report: dict[str, Any] = {"config": vars(args), "results": {}}
+    with tempfile.TemporaryDirectory(prefix="fal-bench-") as tmp:
+        workdir = pathlib.Path(tmp)
+        runners: dict[str, Callable[[], dict[str, Any]]] = {
+            "status": lambda: bench_status(server, args),
+            "detect": lambda: bench_detect(server, args),
+            "upload": lambda: bench_upload(server, args, workdir),
+            "download": lambda: bench_download(server, args, workdir),
+            "cli": lambda: bench_cli(server, args, workdir),
+        }
+        for name in selected:
+            started = time.perf_counter()
+            result = runners[name]()
+            report["results"][name] = result
+            print(f"[Bench] {name} ({time.perf_counter() - started:.1f}s): {json.dumps(result)}")
+    report["stub_counters"] = dict(server.state.counters)
+    server.shutdown()
+    server.server_close()
+
+    if args.json:
+        pathlib.Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"[Bench] Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
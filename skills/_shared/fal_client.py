@@ -6,16 +6,67 @@
 
 from __future__ import annotations
 
+import concurrent.futures
+import contextlib
+import contextvars
+import hashlib
+import json
+import math
 import mimetypes
 import os
 import pathlib
+import random
+import shutil
+import sqlite3
+import statistics
+import threading
 import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from email.utils import parsedate_to_datetime
 from urllib.parse import quote
-from typing import Any, Callable
+from typing import Any, BinaryIO, Callable, Iterable, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
 
 DEFAULT_BASE_URL = "https://api.maxgent.ai"
+DEFAULT_POOL_CONNECTIONS = 8
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_CONNECT_RETRIES = 0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+DEFAULT_UPLOAD_CACHE_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_UPLOAD_CACHE_MAX_ENTRIES = 2000
+DEFAULT_RESULT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+DEFAULT_ROUTE_STATS_WINDOW = 20
+DEFAULT_ROUTE_STATS_MAX_AGE_SECONDS = 6 * 60 * 60
+CACHED_REQUEST_PREFIX = "cache:"
+DEFAULT_CHUNKED_UPLOAD_THRESHOLD = 64 * 1024 * 1024
+DEFAULT_UPLOAD_PART_SIZE = 16 * 1024 * 1024
+MULTIPART_UNSUPPORTED_TTL_SECONDS = 24 * 60 * 60
+UPLOAD_TIMEOUT = (15, 300)
+DEFAULT_DOWNLOAD_CONNECTIONS = 4
+DEFAULT_DOWNLOAD_PIECE_SIZE = 8 * 1024 * 1024
+STATUS_STREAM_TIMEOUT = (15, 60)
+# requests/second and burst per endpoint class, shared by every process using one API key.
+DEFAULT_RATE_LIMITS = {"submit": (2.0, 5.0), "status": (20.0, 40.0), "upload": (4.0, 8.0)}
+
+FAILED_STATUSES = frozenset({"FAILED", "CANCELLED", "ERROR"})
+# Journal status of a job whose cancel request could not be delivered; see FalClient.cancel_pending.
+CANCEL_PENDING_STATUS = "CANCEL_PENDING"
+
+ProgressCallback = Callable[[int, int, float], None]
+# Envelope bytes, in-memory content, or a (path or file object, start, length) range.
+BodySegment = bytes | memoryview | tuple[pathlib.Path | BinaryIO, int, int]
+UploadData = bytes | bytearray | memoryview | BinaryIO | Iterable[bytes]
 
 
 class FalClientError(RuntimeError):
@@ -32,9 +83,16 @@ def _require_api_key(api_key: str | None = None) -> str:
     return token
 
 
+def _base_urls(base_url: str | list[str] | None = None) -> list[str]:
+    # MAX_API_BASE_URL may list several comma-separated endpoints for failover.
+    value = base_url or os.environ.get("MAX_API_BASE_URL") or DEFAULT_BASE_URL
+    items = value if isinstance(value, list) else value.split(",")
+    urls = [item.strip().rstrip("/") for item in items if item.strip()]
+    return urls or [DEFAULT_BASE_URL]
+
+
 def _base_url(base_url: str | None = None) -> str:
-    value = (base_url or os.environ.get("MAX_API_BASE_URL") or DEFAULT_BASE_URL).strip()
-    return value.rstrip("/")
+    return _base_urls(base_url)[0]
 
 
 def _headers(api_key: str | None = None, content_type_json: bool = True) -> dict[str, str]:
@@ -64,33 +122,2309 @@ def _extract_error_message(payload: Any) -> str:
     return str(payload)
 
 
-def _request_json(
+def _cache_dir(create: bool = True) -> pathlib.Path:
+    value = os.environ.get("MAX_FAL_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "maxgent", "fal"
+    )
+    path = pathlib.Path(value).expanduser()
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _daemon_environment() -> dict[str, str]:
+    """Settings a forwarded call depends on: base URLs, cache dir and MAX_FAL_* feature flags."""
+    return {
+        name: value.strip()
+        for name, value in os.environ.items()
+        if value.strip()
+        and (name in {"MAX_API_BASE_URL", "XDG_CACHE_HOME"} or name.startswith("MAX_FAL_"))
+        and name not in {"MAX_FAL_DAEMON", "MAX_FAL_DAEMON_SOCKET"}
+    }
+
+
+def _env_flag(name: str, default: bool = True) -> bool:
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+@contextlib.contextmanager
+def _open_sqlite(path: pathlib.Path) -> Iterator[sqlite3.Connection]:
+    # Several skill processes may share one store; WAL plus a busy timeout serialises writers.
+    conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        yield conn
+    finally:
+        conn.close()
+
+
+def file_sha256(path: pathlib.Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadCache:
+    """On-disk map from file content hash to an uploaded `file_url`.
+
+    A (path, size, mtime) fingerprint skips rehashing unchanged files; entries
+    expire after `ttl_seconds` and the least recently used are evicted past
+    `max_entries`. Backed by SQLite so concurrent processes can share it.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        *,
+        ttl_seconds: float = DEFAULT_UPLOAD_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_UPLOAD_CACHE_MAX_ENTRIES,
+    ):
+        self.path = pathlib.Path(path) if path else _cache_dir() / "uploads.sqlite"
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                "sha256 TEXT NOT NULL, base_url TEXT NOT NULL, file_url TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (sha256, base_url))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> contextlib.AbstractContextManager[sqlite3.Connection]:
+        return _open_sqlite(self.path)
+
+    def content_hash(self, path: pathlib.Path) -> str:
+        stat = path.stat()
+        with self._connect() as conn:
+            row = conn.execute("SELECT size, mtime_ns, sha256 FROM fingerprints WHERE path = ?", (str(path),)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        digest = file_sha256(path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime_ns, digest),
+            )
+        return digest
+
+    def get(self, digest: str, base_url: str) -> str | None:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT file_url, created_at FROM uploads WHERE sha256 = ? AND base_url = ?", (digest, base_url)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM uploads WHERE sha256 = ? AND base_url = ?", (digest, base_url))
+                return None
+            conn.execute("UPDATE uploads SET last_used = ? WHERE sha256 = ? AND base_url = ?", (now, digest, base_url))
+        return row[0]
+
+    def put(self, digest: str, base_url: str, file_url: str, size: int) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO uploads (sha256, base_url, file_url, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, base_url, file_url, size, now, now),
+            )
+            conn.execute("DELETE FROM uploads WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM uploads WHERE rowid NOT IN (SELECT rowid FROM uploads ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+
+class _ProgressMeter:
+    """Throttled (sent_bytes, total_bytes, bytes_per_second) reporting."""
+
+    def __init__(self, total: int, callback: ProgressCallback | None, *, already_sent: int = 0, interval: float = 0.5):
+        self.total = total
+        self.sent = already_sent
+        self.callback = callback
+        self.interval = interval
+        self._baseline = already_sent
+        self._started = time.monotonic()
+        self._last_report = 0.0
+
+    def advance(self, count: int) -> None:
+        self.sent += count
+        now = time.monotonic()
+        if self.callback is not None and (now - self._last_report >= self.interval or self.sent >= self.total):
+            self._last_report = now
+            self.callback(self.sent, self.total, self.throughput())
+
+    def rewind(self, count: int) -> None:
+        self.sent -= count
+
+    def throughput(self) -> float:
+        elapsed = time.monotonic() - self._started
+        return (self.sent - self._baseline) / elapsed if elapsed > 0 else 0.0
+
+
+class _StreamingBody:
+    """File-like request body stitched from byte strings, buffers and file ranges.
+
+    requests streams it via read() and takes Content-Length from __len__, so
+    neither the multipart envelope nor the content is ever held in memory or
+    copied whole. `bytes` segments are envelope; memoryview segments and
+    (path or file object, start, length) ranges are content, which is what
+    progress counts. File objects are left open for their owner to close.
+    """
+
+    def __init__(self, segments: list[BodySegment], meter: _ProgressMeter | None = None):
+        self._segments = segments
+        self._meter = meter
+        self._index = 0
+        self._offset = 0
+        self._handle: Any = None
+        self._length = sum(item[2] if isinstance(item, tuple) else len(item) for item in segments)
+        self._sent = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes | memoryview:
+        if size is None or size < 0:
+            size = self._length
+        chunks: list[bytes | memoryview] = []
+        wanted = size
+        content_bytes = 0
+        while wanted > 0 and self._index < len(self._segments):
+            segment = self._segments[self._index]
+            if isinstance(segment, tuple):
+                source, start, length = segment
+                if self._handle is None:
+                    self._handle = source.open("rb") if isinstance(source, pathlib.Path) else source
+                    self._handle.seek(start)
+                chunk = self._handle.read(min(wanted, length - self._offset))
+                done = self._offset + len(chunk) >= length or not chunk
+                if done and isinstance(source, pathlib.Path):
+                    self._handle.close()
+                if done:
+                    self._handle = None
+            else:
+                chunk = segment[self._offset : self._offset + wanted]
+                done = self._offset + len(chunk) >= len(segment)
+            if not isinstance(segment, bytes):
+                content_bytes += len(chunk)
+            self._offset += len(chunk)
+            wanted -= len(chunk)
+            chunks.append(chunk)
+            if done:
+                self._index += 1
+                self._offset = 0
+        if self._meter is not None and content_bytes:
+            self._sent += content_bytes
+            self._meter.advance(content_bytes)
+        # A memoryview slice goes to the socket as-is; only stitched reads are joined.
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    def reset_progress(self) -> None:
+        if self._meter is not None:
+            self._meter.rewind(self._sent)
+        self._sent = 0
+
+    def close(self) -> None:
+        if self._handle is not None and isinstance(self._segments[self._index][0], pathlib.Path):
+            self._handle.close()
+        self._handle = None
+
+
+def _multipart_envelope(field_name: str, file_name: str, content_type: str) -> tuple[bytes, bytes, str]:
+    boundary = uuid.uuid4().hex
+    safe_name = file_name.replace('"', "%22")
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field_name}"; filename="{safe_name}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode("utf-8")
+    tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return head, tail, f"multipart/form-data; boundary={boundary}"
+
+
+def _multipart_body(
+    field_name: str,
+    file_name: str,
+    content_type: str,
+    content: list[BodySegment],
+    meter: _ProgressMeter | None = None,
+) -> tuple[_StreamingBody, str]:
+    head, tail, header = _multipart_envelope(field_name, file_name, content_type)
+    return _StreamingBody([head, *content, tail], meter), header
+
+
+def _upload_payload_url(payload: Any) -> str | None:
+    if not isinstance(payload, dict):
+        return None
+    data = payload.get("data")
+    return payload.get("file_url") or payload.get("url") or (data.get("url") if isinstance(data, dict) else None)
+
+
+def default_upload_cache() -> UploadCache | None:
+    if not _env_flag("MAX_FAL_UPLOAD_CACHE"):
+        return None
+    try:
+        return UploadCache()
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def payload_hash(model_path: str, payload: Any) -> str:
+    return hashlib.sha256(canonical_json({"model_path": model_path, "payload": payload}).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class JournalEntry:
+    request_id: str
+    model_path: str
+    payload_hash: str
+    base_url: str
+    status: str
+    result_url: str
+    output_path: str
+    created_at: float
+    updated_at: float
+
+
+class JobJournal:
+    """Durable SQLite record of submitted queue jobs.
+
+    Every submit is written before the request_id is handed back, so a run
+    killed mid-wait can reattach to the same job instead of paying for a new
+    one (see `FalClient.queue_submit(..., resume=True)`).
+    """
+
+    _COLUMNS = "request_id, model_path, payload_hash, base_url, status, result_url, output_path, created_at, updated_at"
+
+    def __init__(self, path: str | os.PathLike[str] | None = None):
+        self.path = pathlib.Path(path) if path else _cache_dir() / "jobs.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "request_id TEXT PRIMARY KEY, model_path TEXT NOT NULL, payload_hash TEXT NOT NULL, "
+                "base_url TEXT NOT NULL, status TEXT NOT NULL, result_url TEXT NOT NULL DEFAULT '', "
+                "output_path TEXT NOT NULL DEFAULT '', created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_payload ON jobs (model_path, payload_hash)")
+
+    def _connect(self) -> contextlib.AbstractContextManager[sqlite3.Connection]:
+        return _open_sqlite(self.path)
+
+    def record_submit(self, model_path: str, digest: str, request_id: str, base_url: str) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({self._COLUMNS}) VALUES (?, ?, ?, ?, 'SUBMITTED', '', '', ?, ?)",
+                (request_id, model_path, digest, base_url, now, now),
+            )
+
+    def update(
+        self,
+        request_id: str,
+        *,
+        status: str | None = None,
+        result_url: str | None = None,
+        output_path: str | None = None,
+    ) -> None:
+        fields = {"status": status, "result_url": result_url, "output_path": output_path}
+        assignments = [(name, value) for name, value in fields.items() if value is not None]
+        if not assignments:
+            return
+        sql = ", ".join(f"{name} = ?" for name, _ in assignments)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {sql}, updated_at = ? WHERE request_id = ?",
+                (*(value for _, value in assignments), time.time(), request_id),
+            )
+
+    def get(self, request_id: str) -> JournalEntry | None:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {self._COLUMNS} FROM jobs WHERE request_id = ?", (request_id,)).fetchone()
+        return JournalEntry(*row) if row else None
+
+    def find_resumable(self, model_path: str, digest: str) -> JournalEntry | None:
+        """Most recent job for this exact payload that has not failed."""
+        excluded = sorted(FAILED_STATUSES | {"EXPIRED", "TIMEOUT", CANCEL_PENDING_STATUS})
+        placeholders = ", ".join("?" for _ in excluded)
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE model_path = ? AND payload_hash = ? "
+                f"AND status NOT IN ({placeholders}) ORDER BY created_at DESC LIMIT 1",
+                (model_path, digest, *excluded),
+            ).fetchone()
+        return JournalEntry(*row) if row else None
+
+    def entries(self, *, limit: int = 100, status: str | None = None) -> list[JournalEntry]:
+        where, params = ("WHERE status = ? ", (status,)) if status else ("", ())
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {self._COLUMNS} FROM jobs {where}ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [JournalEntry(*row) for row in rows]
+
+
+class ResultCache:
+    """Opt-in memo of (model_path, payload) -> result JSON plus downloaded media.
+
+    Only payloads with a fixed `seed` are cached unless `require_seed=False`,
+    since anything else is not reproducible. Result JSON and media blobs share
+    one `max_bytes` budget and are evicted least recently used first.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        *,
+        max_bytes: int = DEFAULT_RESULT_CACHE_MAX_BYTES,
+        require_seed: bool = True,
+    ):
+        self.root = pathlib.Path(path) if path else _cache_dir() / "results"
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.require_seed = require_seed
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+
+    def _connect(self) -> contextlib.AbstractContextManager[sqlite3.Connection]:
+        return _open_sqlite(self.root / "index.sqlite")
+
+    def cacheable(self, payload: Any) -> bool:
+        return not self.require_seed or (isinstance(payload, dict) and payload.get("seed") is not None)
+
+    def _lookup(self, key: str) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0] if row else None
+
+    def _store(self, key: str, kind: str, value: str, size: int) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, kind, value, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, value, size, now, now),
+            )
+        self.evict()
+
+    def get_result(self, key: str) -> Any | None:
+        value = self._lookup(f"result:{key}")
+        return json.loads(value) if value is not None else None
+
+    def put_result(self, key: str, result: Any) -> None:
+        value = canonical_json(result)
+        self._store(f"result:{key}", "result", value, len(value.encode("utf-8")))
+
+    def has_result_for_media(self, url: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM entries WHERE kind = 'result' AND instr(value, ?) > 0 LIMIT 1", (json.dumps(url),)
+            ).fetchone()
+        return row is not None
+
+    def media_path(self, url: str) -> pathlib.Path | None:
+        name = self._lookup(f"media:{url}")
+        if name is None:
+            return None
+        blob = self.blob_dir / name
+        return blob if blob.exists() else None
+
+    def put_media(self, url: str, source: pathlib.Path) -> None:
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest() + source.suffix
+        blob = self.blob_dir / name
+        tmp = blob.with_name(f"{blob.name}.{os.getpid()}.tmp")
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, blob)
+        self._store(f"media:{url}", "media", name, blob.stat().st_size)
+
+    def evict(self) -> None:
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, kind, value, size in conn.execute(
+                "SELECT key, kind, value, size FROM entries ORDER BY last_used ASC"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                if kind == "media":
+                    (self.blob_dir / value).unlink(missing_ok=True)
+                total -= size
+
+
+def default_result_cache() -> ResultCache | None:
+    # Unlike uploads, memoizing results changes semantics, so it is opt-in.
+    if not _env_flag("MAX_FAL_RESULT_CACHE", default=False):
+        return None
+    try:
+        return ResultCache()
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def default_job_journal() -> JobJournal | None:
+    if not _env_flag("MAX_FAL_JOURNAL"):
+        return None
+    try:
+        return JobJournal()
+    except (OSError, sqlite3.Error):
+        return None
+
+
+@dataclass
+class RouteSummary:
+    model_path: str
+    samples: int
+    failures: int
+    queue_seconds: float | None  # medians over recent samples
+    run_seconds: float | None
+    total_seconds: float | None
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.samples if self.samples else 0.0
+
+    @property
+    def expected_seconds(self) -> float | None:
+        """Median submit-to-completion time, inflated by the odds of having to resubmit."""
+        if self.total_seconds is None:
+            return None
+        return self.total_seconds / (1.0 - min(self.failure_rate, 0.9))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "failure_rate": self.failure_rate, "expected_seconds": self.expected_seconds}
+
+
+class RouteStats:
+    """Recent per-model queue time, run time and failures, shared by every process.
+
+    FalClient records one sample per queue job it sees reach a terminal
+    status; summaries only look at the last `window` samples within
+    `max_age_seconds`, so they follow the current load rather than history.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        *,
+        window: int = DEFAULT_ROUTE_STATS_WINDOW,
+        max_age_seconds: float = DEFAULT_ROUTE_STATS_MAX_AGE_SECONDS,
+    ):
+        self.path = pathlib.Path(path) if path else _cache_dir() / "route_stats.sqlite"
+        self.window = window
+        self.max_age_seconds = max_age_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                "model_path TEXT NOT NULL, queue_seconds REAL, run_seconds REAL, "
+                "total_seconds REAL NOT NULL, ok INTEGER NOT NULL, recorded_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS samples_route ON samples (model_path, recorded_at)")
+
+    def _connect(self) -> contextlib.AbstractContextManager[sqlite3.Connection]:
+        return _open_sqlite(self.path)
+
+    def record(
+        self,
+        model_path: str,
+        *,
+        total_seconds: float,
+        queue_seconds: float | None = None,
+        run_seconds: float | None = None,
+        ok: bool = True,
+    ) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO samples (model_path, queue_seconds, run_seconds, total_seconds, ok, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (model_path, queue_seconds, run_seconds, total_seconds, int(ok), now),
+            )
+            conn.execute("DELETE FROM samples WHERE recorded_at < ?", (now - 4 * self.max_age_seconds,))
+
+    def summary(self, model_path: str) -> RouteSummary:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT queue_seconds, run_seconds, total_seconds, ok FROM samples "
+                "WHERE model_path = ? AND recorded_at >= ? ORDER BY recorded_at DESC LIMIT ?",
+                (model_path, time.time() - self.max_age_seconds, self.window),
+            ).fetchall()
+
+        def median(values: list[float]) -> float | None:
+            return statistics.median(values) if values else None
+
+        completed = [row for row in rows if row[3]]
+        return RouteSummary(
+            model_path=model_path,
+            samples=len(rows),
+            failures=len(rows) - len(completed),
+            queue_seconds=median([row[0] for row in completed if row[0] is not None]),
+            run_seconds=median([row[1] for row in completed if row[1] is not None]),
+            total_seconds=median([row[2] for row in completed]),
+        )
+
+
+def default_route_stats() -> RouteStats | None:
+    if not _env_flag("MAX_FAL_ROUTE_STATS"):
+        return None
+    try:
+        return RouteStats()
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def _parse_retry_after(value: Any) -> float | None:
+    if value is None or value == "":
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _queue_position(payload: Any) -> int | None:
+    if not isinstance(payload, dict):
+        return None
+    value = payload.get("queue_position")
+    return value if isinstance(value, int) and value >= 0 else None
+
+
+def _progress_fraction(payload: Any) -> float | None:
+    if not isinstance(payload, dict):
+        return None
+    value = payload.get("progress")
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        return None
+    return min(1.0, value / 100 if value > 1 else float(value))
+
+
+@dataclass
+class PollSchedule:
+    """Adaptive delay between queue status polls.
+
+    Polls quickly right after submit, backs off with jitter while the job sits
+    deep in the queue, tightens up once it is IN_PROGRESS and then backs off
+    again towards `queued_interval` (the caller's base interval) for long
+    renders, and never polls sooner than a server-provided Retry-After.
+    """
+
+    initial_interval: float = 0.5
+    initial_polls: int = 3
+    queued_interval: float = 3.0
+    per_queue_position: float = 0.5
+    queued_backoff: float = 1.5
+    in_progress_interval: float = 1.0
+    in_progress_backoff: float = 1.3
+    max_interval: float = 15.0
+    jitter: float = 0.2
+
+    def next_delay(self, status: str, payload: Any, *, polls: int, state_polls: int, retry_after: float | None = None) -> float:
+        position = _queue_position(payload)
+        if polls <= self.initial_polls:
+            delay = self.initial_interval
+        elif status == "IN_PROGRESS":
+            ceiling = max(self.queued_interval, self.in_progress_interval)
+            delay = min(self.in_progress_interval * self.in_progress_backoff ** min(max(state_polls - 1, 0), 16), ceiling)
+        elif status == "IN_QUEUE" and position is not None:
+            delay = self.queued_interval + self.per_queue_position * position
+        else:
+            delay = self.queued_interval * self.queued_backoff ** min(max(state_polls - 1, 0), 8)
+        delay = min(delay, self.max_interval)
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+@dataclass
+class PollStats:
+    calls: int = 0
+    sleep_seconds: float = 0.0
+    last_interval: float = 0.0
+    intervals: list[float] = field(default_factory=list)
+    stream_events: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        # last_interval bounds how late a completion can be noticed.
+        return {
+            "calls": self.calls,
+            "stream_events": self.stream_events,
+            "sleep_seconds": round(self.sleep_seconds, 3),
+            "last_interval": round(self.last_interval, 3),
+            "mean_interval": round(self.sleep_seconds / len(self.intervals), 3) if self.intervals else 0.0,
+        }
+
+
+@dataclass
+class QueueProgress:
+    """queue_position / progress samples for one job, turned into a throughput and an ETA.
+
+    Queue throughput is the drop in position per minute since the first
+    position in the window, measured up to now, so a stalled queue decays
+    towards zero. The run phase uses the job's own progress rate, or
+    `run_seconds_hint` (the route's recent median run time) without one.
+    Rates need samples spanning at least `min_span_seconds`, so a burst of
+    buffered stream events cannot fake a fast queue.
+    """
+
+    run_seconds_hint: float | None = None
+    window: int = 20
+    min_span_seconds: float = 5.0
+    status: str = ""
+    started_at: float | None = None
+    positions: list[tuple[float, int]] = field(default_factory=list)
+    progress: list[tuple[float, float]] = field(default_factory=list)
+
+    def observe(self, status: str, payload: Any, now: float | None = None) -> bool:
+        """Record one status payload; True when queue_position or progress moved."""
+        now = time.time() if now is None else now
+        self.status = status
+        if status == "IN_PROGRESS" and self.started_at is None:
+            self.started_at = now
+        if status == "IN_QUEUE":
+            return self._append(self.positions, now, _queue_position(payload))
+        if status == "IN_PROGRESS":
+            return self._append(self.progress, now, _progress_fraction(payload))
+        return False
+
+    def _append(self, samples: list[tuple[float, Any]], now: float, value: Any) -> bool:
+        if value is None or (samples and samples[-1][1] == value):
+            return False
+        samples.append((now, value))
+        del samples[: -self.window]
+        return True
+
+    def positions_per_minute(self, now: float | None = None) -> float | None:
+        now = time.time() if now is None else now
+        if len(self.positions) < 2 or now - self.positions[0][0] < self.min_span_seconds:
+            return None
+        (first_at, first), (_, last) = self.positions[0], self.positions[-1]
+        return max(0.0, first - last) / (now - first_at) * 60
+
+    def eta_seconds(self, now: float | None = None) -> tuple[float | None, str]:
+        """Seconds until completion and what the estimate is based on."""
+        now = time.time() if now is None else now
+        if self.status == "IN_QUEUE":
+            rate = self.positions_per_minute(now)
+            if not self.positions or not rate:
+                return None, ""
+            queued = self.positions[-1][1] / rate * 60
+            if self.run_seconds_hint is None:
+                return queued, "queue"
+            return queued + self.run_seconds_hint, "queue+route"
+        if self.status == "IN_PROGRESS":
+            if self.progress:
+                # Measured from when the job was first seen running, at progress 0.
+                first_at = self.started_at if self.started_at is not None else self.progress[0][0]
+                last_at, last = self.progress[-1]
+                if last > 0 and last_at - first_at >= self.min_span_seconds:
+                    rate = last / (last_at - first_at)
+                    return max(0.0, (1.0 - last) / rate - (now - last_at)), "progress"
+            if self.run_seconds_hint is not None and self.started_at is not None:
+                return max(0.0, self.run_seconds_hint - (now - self.started_at)), "route"
+        return None, ""
+
+    def as_dict(self, now: float | None = None) -> dict[str, Any]:
+        now = time.time() if now is None else now
+        eta, basis = self.eta_seconds(now)
+        rate = self.positions_per_minute(now)
+        return {
+            "queue_position": self.positions[-1][1] if self.positions else None,
+            "positions_per_minute": None if rate is None else round(rate, 2),
+            "progress": self.progress[-1][1] if self.progress else None,
+            "eta_seconds": None if eta is None else round(eta, 1),
+            "basis": basis,
+        }
+
+
+@dataclass
+class RetryPolicy:
+    """Transient-failure retries for proxy calls.
+
+    Idempotent requests (status/result GETs, uploads) retry on connection
+    errors, timeouts and `retry_statuses`. Non-idempotent POSTs (submit/run)
+    only retry when the server provably did not act on them: connect failures
+    and 429 rejections. Retries draw from a shared budget that refills by
+    `budget_ratio` per request, so a flaking proxy cannot multiply load.
+    """
+
+    max_attempts: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 20.0
+    retry_statuses: frozenset[int] = RETRYABLE_STATUS_CODES
+    budget_ratio: float = 0.2
+    budget_reserve: float = 10.0
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def should_retry_status(self, status_code: int, idempotent: bool) -> bool:
+        if idempotent:
+            return status_code in self.retry_statuses
+        return status_code == 429
+
+    def should_retry_error(self, error: Exception, idempotent: bool) -> bool:
+        if idempotent:
+            return isinstance(error, (requests.ConnectionError, requests.Timeout))
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+@dataclass
+class RetryStats:
+    requests: int = 0
+    attempts: int = 0
+    retries: int = 0
+    gave_up: int = 0
+    budget_exhausted: int = 0
+    backoff_seconds: float = 0.0
+    reasons: dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "gave_up": self.gave_up,
+            "budget_exhausted": self.budget_exhausted,
+            "backoff_seconds": round(self.backoff_seconds, 3),
+            "reasons": dict(self.reasons),
+        }
+
+
+def _iter_sse_events(lines: Iterator[str]) -> Iterator[Any]:
+    data: list[str] = []
+    for line in lines:
+        if line.startswith(":"):
+            continue
+        if not line:
+            if data:
+                text = "\n".join(data)
+                data = []
+                try:
+                    yield json.loads(text)
+                except ValueError:
+                    continue
+            continue
+        name, _, value = line.partition(":")
+        if name == "data":
+            data.append(value[1:] if value.startswith(" ") else value)
+
+
+@dataclass
+class RateLimitStats:
+    acquired: int = 0
+    delayed: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+        }
+
+
+def _parse_rate_limits(value: str) -> dict[str, tuple[float, float]]:
+    # "submit=2/5,status=20/40" -> {"submit": (2.0, 5.0), "status": (20.0, 40.0)}; burst defaults to rate.
+    limits: dict[str, tuple[float, float]] = {}
+    for item in value.split(","):
+        name, _, spec = item.partition("=")
+        rate_text, _, burst_text = spec.partition("/")
+        try:
+            rate = float(rate_text)
+            limits[name.strip()] = (rate, float(burst_text) if burst_text else max(rate, 1.0))
+        except ValueError:
+            continue
+    return limits
+
+
+class RateLimiter:
+    """Token buckets per endpoint class, shared across processes through a locked state file.
+
+    Callers never see an error for exceeding the budget: `acquire` sleeps until
+    a token is available and the delay is recorded in `stats` instead.
+    """
+
+    def __init__(self, limits: dict[str, tuple[float, float]] | None = None, path: str | os.PathLike[str] | None = None):
+        self.limits = dict(DEFAULT_RATE_LIMITS if limits is None else limits)
+        self.path = pathlib.Path(path) if path else _cache_dir() / "ratelimit.json"
+        self.stats: dict[str, RateLimitStats] = {name: RateLimitStats() for name in self.limits}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _locked_state(self) -> Iterator[dict[str, list[float]]]:
+        with self._lock, open(self.path.with_suffix(".lock"), "a+", encoding="utf-8") as lock_handle:
+            if fcntl is not None:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX)
+            try:
+                try:
+                    state = json.loads(self.path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    state = {}
+                yield state
+                tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(state), encoding="utf-8")
+                os.replace(tmp, self.path)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_handle, fcntl.LOCK_UN)
+
+    def acquire(self, rate_class: str, credential: str = "") -> float:
+        """Take one token for `rate_class`, sleeping as needed; returns seconds waited."""
+        limit = self.limits.get(rate_class)
+        if limit is None or limit[0] <= 0:
+            return 0.0
+        rate, burst = limit
+        bucket = f"{hashlib.sha256(credential.encode()).hexdigest()[:16]}:{rate_class}"
+        waited = 0.0
+        while True:
+            with self._locked_state() as state:
+                now = time.time()
+                tokens, updated = state.get(bucket, [burst, now])
+                tokens = min(burst, tokens + (now - updated) * rate)
+                if tokens >= 1:
+                    state[bucket] = [tokens - 1, now]
+                    delay = 0.0
+                else:
+                    state[bucket] = [tokens, now]
+                    delay = (1 - tokens) / rate
+            if delay <= 0:
+                break
+            time.sleep(delay)
+            waited += delay
+        with self._lock:
+            stats = self.stats.setdefault(rate_class, RateLimitStats())
+            stats.acquired += 1
+            if waited:
+                stats.delayed += 1
+                stats.wait_seconds += waited
+                stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+        return waited
+
+    def stats_dict(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+
+def default_rate_limiter() -> RateLimiter | None:
+    if not _env_flag("MAX_FAL_RATE_LIMIT"):
+        return None
+    limits = dict(DEFAULT_RATE_LIMITS)
+    limits.update(_parse_rate_limits(os.environ.get("MAX_FAL_RATE_LIMITS", "")))
+    try:
+        return RateLimiter(limits)
+    except OSError:
+        return None
+
+
+@dataclass
+class EndpointHealth:
+    url: str
+    latency_ewma: float | None = None
+    error_ewma: float = 0.0
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    last_failure_at: float = 0.0
+    requests: int = 0
+    failures: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "latency_ewma": round(self.latency_ewma, 4) if self.latency_ewma is not None else None,
+            "error_ewma": round(self.error_ewma, 4),
+            "circuit_open": self.open_until > time.monotonic(),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class EndpointRouter:
+    """Latency/error-aware choice between several proxy base URLs.
+
+    Each endpoint keeps EWMAs of latency and error rate. `failure_threshold`
+    consecutive failures open its circuit for `open_seconds`; afterwards it
+    is offered again as a half-open trial and closes on the first success.
+    """
+
+    def __init__(self, urls: list[str], *, alpha: float = 0.3, failure_threshold: int = 3, open_seconds: float = 30.0):
+        self.endpoints = {url: EndpointHealth(url) for url in urls}
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def urls(self) -> list[str]:
+        return list(self.endpoints)
+
+    def endpoint_for(self, url: str) -> str | None:
+        for endpoint in self.endpoints:
+            if url == endpoint or url.startswith(endpoint + "/"):
+                return endpoint
+        return None
+
+    def choose(self) -> str:
+        now = time.monotonic()
+        with self._lock:
+            available = [health for health in self.endpoints.values() if health.open_until <= now]
+            if not available:
+                return min(self.endpoints.values(), key=lambda health: health.open_until).url
+            return min(available, key=lambda health: self._score(health, now)).url
+
+    def _score(self, health: EndpointHealth, now: float) -> float:
+        # Unmeasured endpoints score 0 so each gets tried early. The error rate
+        # fades a minute after the last failure so recovered endpoints get traffic again.
+        errors = health.error_ewma * math.exp(-(now - health.last_failure_at) / 60.0)
+        return (health.latency_ewma or 0.0) * (1 + 10 * errors) + 5 * errors
+
+    def record(self, endpoint: str, latency: float | None, ok: bool) -> None:
+        with self._lock:
+            health = self.endpoints.get(endpoint)
+            if health is None:
+                return
+            health.requests += 1
+            health.error_ewma += self.alpha * ((0.0 if ok else 1.0) - health.error_ewma)
+            if latency is not None:
+                previous = health.latency_ewma
+                health.latency_ewma = latency if previous is None else previous + self.alpha * (latency - previous)
+            if ok:
+                health.consecutive_failures = 0
+                health.open_until = 0.0
+                return
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_failure_at = time.monotonic()
+            if health.consecutive_failures >= self.failure_threshold:
+                health.open_until = time.monotonic() + self.open_seconds
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [health.as_dict() for health in self.endpoints.values()]
+
+
+def _build_session(pool_connections: int, pool_maxsize: int, max_retries: int) -> requests.Session:
+    # Connect-level retries only: the request never reached the server, so POSTs stay safe to replay.
+    retry = Retry(total=max_retries, connect=max_retries, read=0, status=0, other=0, backoff_factor=0.3)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@dataclass
+class _JobTiming:
+    model_path: str
+    submitted_at: float
+    started_at: float | None = None
+
+
+class FalClient:
+    """FAL proxy client holding a pooled keep-alive `requests.Session`.
+
+    One instance is safe to share between threads; the module-level functions
+    delegate to a lazily created default instance (see `get_default_client`).
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_retries: int = DEFAULT_CONNECT_RETRIES,
+        retry_policy: RetryPolicy | None = None,
+        upload_cache: UploadCache | None = None,
+        journal: JobJournal | None = None,
+        result_cache: ResultCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+        route_stats: RouteStats | None = None,
+        session: requests.Session | None = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        urls = _base_urls(base_url)
+        self.router = EndpointRouter(urls) if len(urls) > 1 else None
+        self._pins: dict[str, str] = {}
+        self.upload_cache = upload_cache
+        self.journal = journal
+        self.result_cache = result_cache
+        self.rate_limiter = rate_limiter
+        self.route_stats = route_stats
+        self._cache_keys: dict[str, str] = {}
+        self._timings: dict[str, _JobTiming] = {}
+        self.chunked_upload_threshold = DEFAULT_CHUNKED_UPLOAD_THRESHOLD
+        self.upload_part_size = DEFAULT_UPLOAD_PART_SIZE
+        self._multipart_unsupported: set[str] = set()
+        self._stream_unsupported: set[str] = set()
+        self._download_locks: dict[str, threading.Lock] = {}
+        self._download_locks_lock = threading.Lock()
+        self.session = session or _build_session(pool_connections, pool_maxsize, max_retries)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        self._retry_lock = threading.Lock()
+        self._retry_budget = self.retry_policy.budget_reserve
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> FalClient:
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+    def _base_url(self, base_url: str | None = None) -> str:
+        if base_url:
+            return _base_url(base_url)
+        if self.router is not None:
+            return self.router.choose()
+        return _base_url(self.base_url)
+
+    def _pinned_base_url(self, request_id: str, base_url: str | None = None) -> str:
+        """Endpoint that accepted `request_id`; status/result calls must not fail over."""
+        if base_url:
+            return _base_url(base_url)
+        pinned = self._pins.get(request_id)
+        if pinned is None and self.router is not None and self.journal is not None:
+            entry = self.journal.get(request_id)
+            pinned = entry.base_url if entry is not None else None
+        return pinned or self._base_url()
+
+    def _upload_scope(self, base_url: str | None) -> str:
+        # Uploaded file URLs outlive the endpoint that issued them, so cache across the whole pool.
+        if base_url or self.router is None:
+            return self._base_url(base_url)
+        return ",".join(self.router.urls)
+
+    def _headers(self, api_key: str | None = None, content_type_json: bool = True) -> dict[str, str]:
+        return _headers(api_key or self.api_key, content_type_json=content_type_json)
+
+    def _take_retry_token(self) -> bool:
+        with self._retry_lock:
+            if self._retry_budget < 1:
+                self.retry_stats.budget_exhausted += 1
+                return False
+            self._retry_budget -= 1
+            return True
+
+    def _record_retry(self, reason: str, delay: float) -> None:
+        with self._retry_lock:
+            self.retry_stats.retries += 1
+            self.retry_stats.backoff_seconds += delay
+            self.retry_stats.reasons[reason] = self.retry_stats.reasons.get(reason, 0) + 1
+
+    def _send(
+        self,
+        send: Callable[[], requests.Response],
+        *,
+        idempotent: bool,
+        rate_class: str | None = None,
+        credential: str = "",
+    ) -> requests.Response:
+        policy = self.retry_policy
+        with self._retry_lock:
+            self.retry_stats.requests += 1
+            self._retry_budget = min(self._retry_budget + policy.budget_ratio, policy.budget_reserve)
+        attempt = 0
+        while True:
+            attempt += 1
+            with self._retry_lock:
+                self.retry_stats.attempts += 1
+            if rate_class and self.rate_limiter is not None:
+                self.rate_limiter.acquire(rate_class, credential)
+            try:
+                response = send()
+            except requests.RequestException as exc:
+                if not policy.should_retry_error(exc, idempotent):
+                    raise
+                if attempt >= policy.max_attempts or not self._take_retry_token():
+                    with self._retry_lock:
+                        self.retry_stats.gave_up += 1
+                    raise
+                delay = policy.backoff(attempt)
+                self._record_retry(type(exc).__name__, delay)
+                time.sleep(delay)
+                continue
+
+            if not policy.should_retry_status(response.status_code, idempotent):
+                return response
+            if attempt >= policy.max_attempts or not self._take_retry_token():
+                with self._retry_lock:
+                    self.retry_stats.gave_up += 1
+                return response
+            delay = policy.backoff(attempt, _parse_retry_after(response.headers.get("Retry-After")))
+            self._record_retry(f"HTTP {response.status_code}", delay)
+            response.close()
+            time.sleep(delay)
+
+    def _request_json(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        *,
+        json_payload: Any | None = None,
+        timeout: int = 120,
+        rate_class: str | None = None,
+        failover: bool = False,
+    ) -> Any:
+        return self._request(
+            method, url, headers, json_payload=json_payload, timeout=timeout, rate_class=rate_class, failover=failover
+        )[0]
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        *,
+        json_payload: Any | None = None,
+        timeout: int = 120,
+        rate_class: str | None = None,
+        failover: bool = False,
+    ) -> tuple[Any, requests.Response]:
+        """Send one JSON request; returns (payload, response).
+
+        With failover=True and several endpoints configured, each retry
+        attempt is re-routed to the currently healthiest endpoint.
+        """
+        router = self.router
+
+        def send() -> requests.Response:
+            target = url
+            endpoint = router.endpoint_for(url) if router is not None else None
+            if failover and endpoint is not None:
+                chosen = router.choose()
+                target, endpoint = chosen + url[len(endpoint) :], chosen
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, target, headers=headers, json=json_payload, timeout=timeout)
+            except requests.RequestException:
+                if endpoint is not None:
+                    router.record(endpoint, None, ok=False)
+                raise
+            if endpoint is not None:
+                router.record(endpoint, time.monotonic() - started, ok=response.status_code < 500)
+            return response
+
+        response = self._send(
+            send,
+            idempotent=method.upper() in IDEMPOTENT_METHODS,
+            rate_class=rate_class,
+            credential=headers.get("Authorization", ""),
+        )
+        try:
+            payload = response.json() if response.text else {}
+        except ValueError as exc:
+            raise FalClientError(f"Invalid JSON response ({response.status_code})", response.status_code) from exc
+
+        if not response.ok:
+            raise FalClientError(
+                f"HTTP {response.status_code}: {_extract_error_message(payload)}",
+                status_code=response.status_code,
+                payload=payload,
+            )
+        return payload, response
+
+    def _result_cache_key(self, model_path: str, payload: Any) -> str | None:
+        if self.result_cache is None or not self.result_cache.cacheable(payload):
+            return None
+        return payload_hash(model_path, payload)
+
+    def run(
+        self,
+        model_path: str,
+        payload: dict[str, Any],
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        bypass_cache: bool = False,
+    ) -> Any:
+        cache_key = self._result_cache_key(model_path, payload)
+        if cache_key and not bypass_cache:
+            cached = self.result_cache.get_result(cache_key)
+            if cached is not None:
+                return cached
+        encoded = _encode_model_path(model_path)
+        url = f"{self._base_url(base_url)}/api/fal/run/{encoded}"
+        result = self._request_json(
+            "POST", url, self._headers(api_key), json_payload=payload, rate_class="submit", failover=True
+        )
+        if cache_key:
+            self.result_cache.put_result(cache_key, result)
+        return result
+
+    def queue_submit(
+        self,
+        model_path: str,
+        payload: dict[str, Any],
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        resume: bool = False,
+        bypass_cache: bool = False,
+    ) -> Any:
+        """Submit a queue job; with resume=True, reattach to a journalled job for the same payload.
+
+        A resumed response carries `"resumed": True` plus the journalled
+        status, result_url and output_path. With a result cache hit the
+        request_id is a local `cache:` id whose status/result never touch the
+        network.
+        """
+        digest = payload_hash(model_path, payload)
+        cache_key = self._result_cache_key(model_path, payload)
+        if cache_key and not bypass_cache and self.result_cache.get_result(cache_key) is not None:
+            return {"request_id": f"{CACHED_REQUEST_PREFIX}{cache_key}", "cached": True}
+        if resume and self.journal is not None:
+            entry = self.journal.find_resumable(model_path, digest)
+            if entry is not None:
+                if self.route_stats is not None and entry.status != "COMPLETED":
+                    self._timings[entry.request_id] = _JobTiming(model_path, entry.created_at)
+                return {
+                    "request_id": entry.request_id,
+                    "resumed": True,
+                    "status": entry.status,
+                    "result_url": entry.result_url,
+                    "output_path": entry.output_path,
+                }
+
+        encoded = _encode_model_path(model_path)
+        url = f"{self._base_url(base_url)}/api/fal/queue/{encoded}"
+        created, response = self._request(
+            "POST", url, self._headers(api_key), json_payload=payload, rate_class="submit", failover=True
+        )
+        accepted_base = (self.router.endpoint_for(response.url) if self.router is not None else None) or self._base_url(
+            base_url
+        )
+        request_id = created.get("request_id") if isinstance(created, dict) else None
+        if request_id:
+            self._pins[str(request_id)] = accepted_base
+        if request_id and self.journal is not None:
+            self.journal.record_submit(model_path, digest, str(request_id), accepted_base)
+        if request_id and cache_key:
+            self._cache_keys[str(request_id)] = cache_key
+        if request_id and self.route_stats is not None:
+            self._timings[str(request_id)] = _JobTiming(model_path, time.time())
+        return created
+
+    def _journal_status(self, request_id: str, status: str) -> None:
+        if self.journal is not None and status:
+            try:
+                self.journal.update(request_id, status=status)
+            except sqlite3.Error:
+                pass
+
+    def _record_status(self, request_id: str, status: str) -> None:
+        self._journal_status(request_id, status)
+        if status in FAILED_STATUSES | {"TIMEOUT"}:
+            # No result will be fetched; COMPLETED jobs drop their pin in queue_result.
+            self._pins.pop(request_id, None)
+        if self.route_stats is not None:
+            self._record_timing(request_id, status)
+
+    def _run_seconds_hint(self, model_path: str) -> float | None:
+        if self.route_stats is None:
+            return None
+        try:
+            return self.route_stats.summary(model_path).run_seconds
+        except sqlite3.Error:
+            return None
+
+    def _record_timing(self, request_id: str, status: str) -> None:
+        timing = self._timings.get(request_id)
+        if timing is None:
+            return
+        now = time.time()
+        if status == "IN_PROGRESS":
+            if timing.started_at is None:
+                timing.started_at = now
+            return
+        if status != "COMPLETED" and status not in FAILED_STATUSES | {"TIMEOUT"}:
+            return
+        self._timings.pop(request_id, None)
+        started = timing.started_at
+        try:
+            self.route_stats.record(  # type: ignore[union-attr]
+                timing.model_path,
+                total_seconds=now - timing.submitted_at,
+                # A job first seen COMPLETED never showed where queueing ended.
+                queue_seconds=None if started is None else started - timing.submitted_at,
+                run_seconds=None if started is None else now - started,
+                ok=status == "COMPLETED",
+            )
+        except sqlite3.Error:
+            pass
+
+    def queue_status(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> Any:
+        return self._queue_status(model_path, request_id, api_key=api_key, base_url=base_url)[0]
+
+    def _queue_status(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> tuple[Any, Any]:
+        if request_id.startswith(CACHED_REQUEST_PREFIX):
+            return {"status": "COMPLETED", "cached": True}, {}
+        encoded_model = _encode_model_path(model_path)
+        encoded_request = quote(request_id, safe="")
+        url = f"{self._pinned_base_url(request_id, base_url)}/api/fal/queue/{encoded_model}/requests/{encoded_request}/status"
+        payload, response = self._request("GET", url, self._headers(api_key, content_type_json=False), rate_class="status")
+        return payload, response.headers
+
+    def queue_status_stream(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> Iterator[Any]:
+        """Yield status payloads from the server-sent event stream until it closes.
+
+        Raises FalClientError when the proxy does not offer a stream for the job.
+        """
+        encoded_model = _encode_model_path(model_path)
+        encoded_request = quote(request_id, safe="")
+        base = self._pinned_base_url(request_id, base_url)
+        url = f"{base}/api/fal/queue/{encoded_model}/requests/{encoded_request}/status/stream"
+        headers = {**self._headers(api_key, content_type_json=False), "Accept": "text/event-stream"}
+        with self._send(
+            lambda: self.session.get(url, headers=headers, stream=True, timeout=STATUS_STREAM_TIMEOUT),
+            idempotent=True,
+            rate_class="status",
+            credential=headers["Authorization"],
+        ) as response:
+            content_type = response.headers.get("Content-Type", "")
+            if not response.ok or "text/event-stream" not in content_type:
+                raise FalClientError(f"Status stream unavailable ({response.status_code})", response.status_code)
+            yield from _iter_sse_events(response.iter_lines(decode_unicode=True))
+
+    def queue_result(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> Any:
+        if request_id.startswith(CACHED_REQUEST_PREFIX) and self.result_cache is not None:
+            cached = self.result_cache.get_result(request_id[len(CACHED_REQUEST_PREFIX) :])
+            if cached is not None:
+                return cached
+            raise FalClientError(f"Cached result evicted for {request_id}")
+        encoded_model = _encode_model_path(model_path)
+        encoded_request = quote(request_id, safe="")
+        url = f"{self._pinned_base_url(request_id, base_url)}/api/fal/queue/{encoded_model}/requests/{encoded_request}"
+        result = self._request_json("GET", url, self._headers(api_key, content_type_json=False), rate_class="status")
+        self._pins.pop(request_id, None)
+        cache_key = self._cache_keys.pop(request_id, None)
+        if cache_key and self.result_cache is not None:
+            self.result_cache.put_result(cache_key, result)
+        return result
+
+    def queue_cancel(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> Any:
+        """Ask the proxy to cancel a queued or running job.
+
+        Returns the proxy's answer, {"status": "CANCELLATION_REQUESTED"} or
+        {"status": "ALREADY_COMPLETED"}, and journals the job as CANCELLED or
+        COMPLETED. When the cancel cannot be delivered (network error, 429,
+        5xx) the job is journalled as CANCEL_PENDING for cancel_pending() to
+        retry, and FalClientError is raised.
+        """
+        if request_id.startswith(CACHED_REQUEST_PREFIX):
+            return {"status": "ALREADY_COMPLETED"}
+        encoded_model = _encode_model_path(model_path)
+        encoded_request = quote(request_id, safe="")
+        url = (
+            f"{self._pinned_base_url(request_id, base_url)}/api/fal/queue/{encoded_model}"
+            f"/requests/{encoded_request}/cancel"
+        )
+        try:
+            payload = self._request_json("PUT", url, self._headers(api_key, content_type_json=False), rate_class="status")
+        except FalClientError as exc:
+            if exc.status_code == 400 and isinstance(exc.payload, dict) and exc.payload.get("status") == "ALREADY_COMPLETED":
+                self._journal_status(request_id, "COMPLETED")
+                return exc.payload
+            if exc.status_code is None or exc.status_code == 429 or exc.status_code >= 500:
+                self._journal_status(request_id, CANCEL_PENDING_STATUS)
+            raise
+        except requests.RequestException as exc:
+            self._journal_status(request_id, CANCEL_PENDING_STATUS)
+            raise FalClientError(f"Cancel failed for {request_id}: {exc}") from exc
+        # A cancelled job says nothing about the route's latency.
+        self._timings.pop(request_id, None)
+        self._pins.pop(request_id, None)
+        self._journal_status(request_id, "CANCELLED")
+        return payload
+
+    def cancel_quietly(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> bool:
+        """Best-effort queue_cancel for cleanup paths; True when a cancel was accepted."""
+        try:
+            outcome = self.queue_cancel(model_path, request_id, api_key=api_key, base_url=base_url)
+        except FalClientError:
+            return False
+        return isinstance(outcome, dict) and outcome.get("status") == "CANCELLATION_REQUESTED"
+
+    def cancel_pending(self, *, limit: int = 100) -> int:
+        """Retry cancels journalled as CANCEL_PENDING; returns how many were accepted."""
+        if self.journal is None:
+            return 0
+        try:
+            entries = self.journal.entries(limit=limit, status=CANCEL_PENDING_STATUS)
+        except sqlite3.Error:
+            return 0
+        accepted = 0
+        for entry in entries:
+            try:
+                outcome = self.queue_cancel(entry.model_path, entry.request_id, base_url=entry.base_url)
+            except FalClientError as exc:
+                if exc.status_code == 404:
+                    self._journal_status(entry.request_id, "EXPIRED")
+                continue
+            accepted += isinstance(outcome, dict) and outcome.get("status") == "CANCELLATION_REQUESTED"
+        return accepted
+
+    def queue_wait(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        max_wait_seconds: int = 20 * 60,
+        poll_interval_seconds: float = 3,
+        poll_schedule: PollSchedule | None = None,
+        on_status: Callable[[str, Any, int], None] | None = None,
+        stream: bool | None = None,
+        cancel_on_timeout: bool = True,
+    ) -> Any:
+        """Wait for a queue job, via the status event stream when available.
+
+        stream=None follows MAX_FAL_STATUS_STREAM (on by default). If the
+        proxy has no stream or it drops, waiting continues on the adaptive
+        polling schedule. on_status receives the status payload plus a "poll"
+        entry with PollStats.as_dict() and an "eta" entry with
+        QueueProgress.as_dict(); it fires on every status change and whenever
+        queue_position or progress moves. A job still unfinished after
+        max_wait_seconds is cancelled (best effort) unless cancel_on_timeout=False.
+        """
+        schedule = poll_schedule or PollSchedule(queued_interval=poll_interval_seconds)
+        stats = PollStats()
+        progress = QueueProgress(run_seconds_hint=self._run_seconds_hint(model_path))
+        started = time.time()
+        last_status = ""
+        state_polls = 0
+
+        def observe(status_payload: Any) -> str:
+            nonlocal last_status, state_polls
+            status = str(status_payload.get("status", "")).upper()
+            elapsed = int(time.time() - started)
+            state_polls = state_polls + 1 if status == last_status else 1
+            moved = progress.observe(status, status_payload)
+            if status and status != last_status:
+                self._record_status(request_id, status)
+            if status and (status != last_status or moved) and on_status is not None:
+                on_status(status, {**status_payload, "poll": stats.as_dict(), "eta": progress.as_dict()}, elapsed)
+            if status:
+                last_status = status
+            if status in FAILED_STATUSES:
+                raise FalClientError(f"Queue failed with status {status}: {_extract_error_message(status_payload)}")
+            return status
+
+        resolved_base = self._pinned_base_url(request_id, base_url)
+        use_stream = _env_flag("MAX_FAL_STATUS_STREAM") if stream is None else stream
+        if use_stream and resolved_base not in self._stream_unsupported and not request_id.startswith(CACHED_REQUEST_PREFIX):
+            try:
+                for event in self.queue_status_stream(model_path, request_id, api_key=api_key, base_url=base_url):
+                    if not isinstance(event, dict):
+                        continue
+                    stats.stream_events += 1
+                    if observe(event) == "COMPLETED":
+                        return event
+                    if time.time() - started >= max_wait_seconds:
+                        break
+            except FalClientError as exc:
+                if exc.status_code is None:
+                    raise
+                if exc.status_code in {404, 405, 406, 501} or exc.status_code < 300:
+                    self._stream_unsupported.add(resolved_base)
+            except requests.RequestException:
+                pass  # Stream dropped; fall back to polling.
+
+        while time.time() - started < max_wait_seconds:
+            status_payload, response_headers = self._queue_status(model_path, request_id, api_key=api_key, base_url=base_url)
+            stats.calls += 1
+            status = observe(status_payload)
+            if status == "COMPLETED":
+                return status_payload
+            retry_after = _parse_retry_after(response_headers.get("Retry-After"))
+            if retry_after is None:
+                retry_after = _parse_retry_after(status_payload.get("retry_after"))
+            delay = schedule.next_delay(
+                status, status_payload, polls=stats.calls, state_polls=state_polls, retry_after=retry_after
+            )
+            delay = max(0.0, min(delay, max_wait_seconds - (time.time() - started)))
+            stats.last_interval = delay
+            stats.sleep_seconds += delay
+            stats.intervals.append(delay)
+            time.sleep(delay)
+        self._record_status(request_id, "TIMEOUT")
+        if cancel_on_timeout:
+            self.cancel_quietly(model_path, request_id, api_key=api_key, base_url=base_url)
+        raise FalClientError(f"Queue wait timeout after {max_wait_seconds} seconds")
+
+    def upload_file(
+        self,
+        file_path: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        use_cache: bool = True,
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        abs_path = pathlib.Path(file_path).expanduser().resolve()
+        if not abs_path.exists():
+            raise FalClientError(f"File not found: {abs_path}")
+
+        cache = self.upload_cache if use_cache else None
+        resolved_base = self._base_url(base_url)
+        scope = self._upload_scope(base_url)
+        digest = ""
+        if cache is not None:
+            digest = cache.content_hash(abs_path)
+            cached_url = cache.get(digest, scope)
+            if cached_url:
+                return cached_url
+
+        size = abs_path.stat().st_size
+        file_url = None
+        if size >= self.chunked_upload_threshold and self._multipart_supported(resolved_base):
+            file_url = self._upload_file_chunked(abs_path, resolved_base, api_key, on_progress)
+        if file_url is None:
+            file_url = self._upload_file(abs_path, resolved_base, api_key, on_progress)
+        if cache is not None:
+            cache.put(digest, scope, file_url, abs_path.stat().st_size)
+        return file_url
+
+    def upload_data(
+        self,
+        data: UploadData,
+        content_type: str,
+        *,
+        file_name: str | None = None,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        use_cache: bool = True,
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        """Upload in-memory or streamed content without going through a temp file.
+
+        `data` may be bytes/bytearray/memoryview (sent straight from the
+        buffer), a file object (seekable ones are sized, hashed for the upload
+        cache and retried; others are streamed like an iterator), or an
+        iterable of byte chunks, sent with chunked transfer encoding. Streams
+        are hashed as they go out, so a later upload of the same bytes hits
+        the cache, but they cannot be replayed after a failed attempt.
+        """
+        name = file_name or f"upload{mimetypes.guess_extension(content_type) or '.bin'}"
+        cache = self.upload_cache if use_cache else None
+        resolved_base = self._base_url(base_url)
+        scope = self._upload_scope(base_url)
+
+        segment: BodySegment | None = None
+        digest = ""
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            segment = memoryview(data).cast("B")
+            size = len(segment)
+            digest = hashlib.sha256(segment).hexdigest() if cache is not None else ""
+        elif hasattr(data, "read"):
+            try:
+                start = data.tell()
+                size = data.seek(0, os.SEEK_END) - start
+                data.seek(start)
+            except (AttributeError, OSError, ValueError):
+                pass  # Not seekable; stream it.
+            else:
+                segment = (data, start, size)
+                if cache is not None:
+                    hasher = hashlib.sha256()
+                    for chunk in iter(lambda: data.read(1024 * 1024), b""):
+                        hasher.update(chunk)
+                    data.seek(start)
+                    digest = hasher.hexdigest()
+
+        if digest:
+            cached_url = cache.get(digest, scope)
+            if cached_url:
+                return cached_url
+        if segment is not None:
+            file_url = self._upload_form(name, content_type, [segment], size, resolved_base, api_key, on_progress)
+            if cache is not None:
+                cache.put(digest, scope, file_url, size)
+            return file_url
+
+        chunks = iter(lambda: data.read(1024 * 1024), b"") if hasattr(data, "read") else iter(data)
+        hasher = hashlib.sha256()
+        file_url, size = self._upload_stream(name, content_type, chunks, hasher, resolved_base, api_key, on_progress)
+        if cache is not None:
+            cache.put(hasher.hexdigest(), scope, file_url, size)
+        return file_url
+
+    def _upload_file(
+        self,
+        abs_path: pathlib.Path,
+        base_url: str,
+        api_key: str | None,
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        mime_type, _ = mimetypes.guess_type(str(abs_path))
+        size = abs_path.stat().st_size
+        content_type = mime_type or "application/octet-stream"
+        return self._upload_form(abs_path.name, content_type, [(abs_path, 0, size)], size, base_url, api_key, on_progress)
+
+    def _upload_form(
+        self,
+        file_name: str,
+        content_type: str,
+        content: list[BodySegment],
+        size: int,
+        base_url: str,
+        api_key: str | None,
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        url = f"{base_url}/api/fal/files/upload"
+        meter = _ProgressMeter(size, on_progress)
+
+        def send() -> requests.Response:
+            body, form_type = _multipart_body("file", file_name, content_type, content, meter)
+            headers = {**self._headers(api_key, content_type_json=False), "Content-Type": form_type}
+            try:
+                response = self.session.post(url, headers=headers, data=body, timeout=UPLOAD_TIMEOUT)
+            except requests.RequestException:
+                body.reset_progress()
+                raise
+            finally:
+                body.close()
+            if not response.ok:
+                body.reset_progress()
+            return response
+
+        # A repeated upload only yields another file_url, so uploads retry like GETs.
+        response = self._send(
+            send, idempotent=True, rate_class="upload", credential=self._headers(api_key)["Authorization"]
+        )
+        return self._upload_response_url(response)
+
+    def _upload_stream(
+        self,
+        file_name: str,
+        content_type: str,
+        chunks: Iterator[bytes],
+        hasher: Any,
+        base_url: str,
+        api_key: str | None,
+        on_progress: ProgressCallback | None = None,
+    ) -> tuple[str, int]:
+        """Upload an unsized one-shot stream with chunked transfer encoding."""
+        url = f"{base_url}/api/fal/files/upload"
+        head, tail, form_type = _multipart_envelope("file", file_name, content_type)
+        meter = _ProgressMeter(0, on_progress)
+        consumed = False
+        last_status: int | None = None
+
+        def body() -> Iterator[bytes | memoryview]:
+            nonlocal consumed
+            yield head
+            for chunk in chunks:
+                consumed = True
+                hasher.update(chunk)
+                meter.total += len(chunk)
+                meter.advance(len(chunk))
+                yield chunk
+            yield tail
+
+        def send() -> requests.Response:
+            nonlocal last_status
+            if consumed:
+                # Connect failures happen before the stream is read; anything later cannot be replayed.
+                raise FalClientError(
+                    f"Upload failed ({last_status}) and the stream cannot be replayed", status_code=last_status
+                )
+            headers = {**self._headers(api_key, content_type_json=False), "Content-Type": form_type}
+            response = self.session.post(url, headers=headers, data=body(), timeout=UPLOAD_TIMEOUT)
+            last_status = response.status_code
+            return response
+
+        response = self._send(
+            send, idempotent=False, rate_class="upload", credential=self._headers(api_key)["Authorization"]
+        )
+        return self._upload_response_url(response), meter.sent
+
+    def _upload_response_url(self, response: requests.Response) -> str:
+        try:
+            payload = response.json() if response.text else {}
+        except ValueError:
+            payload = {"message": response.text[:200]}
+
+        if not response.ok:
+            if response.status_code == 404:
+                raise FalClientError("FAL upload proxy is not available. Expected endpoint: /api/fal/files/upload", 404)
+            raise FalClientError(
+                f"Upload failed ({response.status_code}): {_extract_error_message(payload)}",
+                status_code=response.status_code,
+                payload=payload,
+            )
+
+        file_url = _upload_payload_url(payload)
+        if not file_url:
+            raise FalClientError(f"Upload response missing file_url: {payload}")
+        return str(file_url)
+
+    def _multipart_supported(self, base_url: str) -> bool:
+        """False while a recent probe (this process or, via the cache dir, another) found no multipart endpoints."""
+        if base_url in self._multipart_unsupported:
+            return False
+        try:
+            verdicts = json.loads((_cache_dir() / "multipart" / "unsupported.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return True
+        checked_at = verdicts.get(base_url) if isinstance(verdicts, dict) else None
+        if isinstance(checked_at, (int, float)) and time.time() - checked_at < MULTIPART_UNSUPPORTED_TTL_SECONDS:
+            self._multipart_unsupported.add(base_url)
+            return False
+        return True
+
+    def _mark_multipart_unsupported(self, base_url: str) -> None:
+        self._multipart_unsupported.add(base_url)
+        try:
+            path = _cache_dir() / "multipart" / "unsupported.json"
+            try:
+                verdicts = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                verdicts = {}
+            if not isinstance(verdicts, dict):
+                verdicts = {}
+            verdicts[base_url] = time.time()
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(verdicts), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass  # The in-memory verdict still spares this process further probes.
+
+    def _upload_file_chunked(
+        self,
+        abs_path: pathlib.Path,
+        base_url: str,
+        api_key: str | None,
+        on_progress: ProgressCallback | None = None,
+    ) -> str | None:
+        """Resumable multipart upload; returns None when the proxy lacks the multipart endpoints.
+
+        Completed part ETags are kept in a state file keyed by the file's
+        (path, size, mtime) fingerprint, so a rerun after a failure only sends
+        the parts that are still missing.
+        """
+        stat = abs_path.stat()
+        fingerprint = hashlib.sha256(f"{abs_path}|{stat.st_size}|{stat.st_mtime_ns}|{base_url}".encode()).hexdigest()
+        state_dir = _cache_dir() / "multipart"
+        state_dir.mkdir(parents=True, exist_ok=True)
+        state_path = state_dir / f"{fingerprint}.json"
+        multipart_url = f"{base_url}/api/fal/files/upload/multipart"
+
+        state: dict[str, Any] = {}
+        if state_path.exists():
+            try:
+                state = json.loads(state_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                state = {}
+        if not state.get("upload_id"):
+            mime_type, _ = mimetypes.guess_type(str(abs_path))
+            try:
+                created = self._request_json(
+                    "POST",
+                    f"{multipart_url}/initiate",
+                    self._headers(api_key),
+                    json_payload={
+                        "file_name": abs_path.name,
+                        "content_type": mime_type or "application/octet-stream",
+                        "size": stat.st_size,
+                    },
+                    rate_class="upload",
+                )
+            except FalClientError as exc:
+                if exc.status_code in {404, 405, 501}:
+                    self._mark_multipart_unsupported(base_url)
+                    return None
+                raise
+            part_size = int(created.get("part_size") or self.upload_part_size)
+            state = {"upload_id": str(created["upload_id"]), "part_size": part_size, "parts": {}}
+            state_path.write_text(json.dumps(state), encoding="utf-8")
+
+        upload_id = quote(state["upload_id"], safe="")
+        part_size = int(state["part_size"])
+        parts: dict[str, str] = state["parts"]
+        total_parts = max(1, -(-stat.st_size // part_size))
+        already_sent = sum(min(part_size, stat.st_size - (int(n) - 1) * part_size) for n in parts)
+        meter = _ProgressMeter(stat.st_size, on_progress, already_sent=already_sent)
+        headers = {**self._headers(api_key, content_type_json=False), "Content-Type": "application/octet-stream"}
+
+        for number in range(1, total_parts + 1):
+            if str(number) in parts:
+                continue
+            start = (number - 1) * part_size
+            length = min(part_size, stat.st_size - start)
+
+            def send(start: int = start, length: int = length, number: int = number) -> requests.Response:
+                body = _StreamingBody([(abs_path, start, length)], meter)
+                try:
+                    response = self.session.put(
+                        f"{multipart_url}/{upload_id}/parts/{number}", headers=headers, data=body, timeout=UPLOAD_TIMEOUT
+                    )
+                except requests.RequestException:
+                    body.reset_progress()
+                    raise
+                finally:
+                    body.close()
+                if not response.ok:
+                    body.reset_progress()
+                return response
+
+            response = self._send(send, idempotent=True, rate_class="upload", credential=headers["Authorization"])
+            if not response.ok:
+                if response.status_code == 404:
+                    # The proxy forgot this upload; start over on the next attempt.
+                    state_path.unlink(missing_ok=True)
+                raise FalClientError(
+                    f"Upload part {number}/{total_parts} failed ({response.status_code})", status_code=response.status_code
+                )
+            try:
+                etag = (response.json() if response.text else {}).get("etag") or response.headers.get("ETag", "")
+            except ValueError:
+                etag = response.headers.get("ETag", "")
+            parts[str(number)] = etag
+            state_path.write_text(json.dumps(state), encoding="utf-8")
+
+        completed = self._request_json(
+            "POST",
+            f"{multipart_url}/{upload_id}/complete",
+            self._headers(api_key),
+            json_payload={"parts": [{"part_number": int(n), "etag": parts[n]} for n in sorted(parts, key=int)]},
+            rate_class="upload",
+        )
+        state_path.unlink(missing_ok=True)
+        file_url = _upload_payload_url(completed)
+        if not file_url:
+            raise FalClientError(f"Upload response missing file_url: {completed}")
+        return str(file_url)
+
+    def download_to_file(
+        self,
+        file_url: str,
+        output_path: str,
+        *,
+        timeout: int = 300,
+        connections: int = DEFAULT_DOWNLOAD_CONNECTIONS,
+        sha256: str | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        """Download into a `.part` file and rename into place once verified.
+
+        When the server advertises byte ranges, pieces are fetched over
+        `connections` parallel requests, a dropped connection re-requests only
+        the missing bytes, and completed pieces are recorded next to the
+        `.part` file. Both are named after the URL, so an interrupted download
+        resumes on the next call even with a different output path. Otherwise
+        the body is streamed over a single connection. Concurrent downloads of
+        the same URL into the same directory take turns on the `.part` file.
+        """
+        output = pathlib.Path(output_path).expanduser().resolve()
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        cached_media = self.result_cache.media_path(file_url) if self.result_cache is not None else None
+        if cached_media is not None:
+            copy_path = output.with_name(output.name + ".part")
+            shutil.copyfile(cached_media, copy_path)
+            os.replace(copy_path, output)
+            return str(output)
+
+        part_stem = f".fal-download-{hashlib.sha256(file_url.encode()).hexdigest()[:16]}"
+        part_path = output.with_name(part_stem + ".part")
+        state_path = output.with_name(part_stem + ".part.json")
+        with self._download_lock(part_path):
+            size, etag, ranged = self._probe_download(file_url, timeout)
+            meter = _ProgressMeter(size or 0, on_progress)
+            try:
+                if ranged and size and connections > 1 and size > DEFAULT_DOWNLOAD_PIECE_SIZE:
+                    try:
+                        self._download_ranges(
+                            file_url, part_path, state_path, size, etag, connections, timeout, meter
+                        )
+                    except FalClientError as exc:
+                        if exc.status_code != 200:
+                            raise
+                        # Server ignored the Range header after all; fetch the whole body instead.
+                        state_path.unlink(missing_ok=True)
+                        meter = _ProgressMeter(size, on_progress)
+                        self._download_stream(file_url, part_path, timeout, meter, ranged=False)
+                else:
+                    self._download_stream(file_url, part_path, timeout, meter, ranged=ranged)
+            except BaseException:
+                if not state_path.exists():
+                    part_path.unlink(missing_ok=True)  # Nothing recorded to resume from.
+                raise
+
+            actual_size = part_path.stat().st_size
+            if (size is not None and actual_size != size) or (sha256 and file_sha256(part_path) != sha256.lower()):
+                part_path.unlink(missing_ok=True)
+                state_path.unlink(missing_ok=True)
+                if size is not None and actual_size != size:
+                    raise FalClientError(f"Download incomplete: got {actual_size} of {size} bytes from {file_url}")
+                raise FalClientError(f"Download checksum mismatch for {file_url}")
+            os.replace(part_path, output)
+            state_path.unlink(missing_ok=True)
+        if self.result_cache is not None and self.result_cache.has_result_for_media(file_url):
+            self.result_cache.put_media(file_url, output)
+        return str(output)
+
+    @contextlib.contextmanager
+    def _download_lock(self, part_path: pathlib.Path) -> Iterator[None]:
+        """Exclusive use of one `.part` file across threads and, via the cache dir, processes."""
+        key = hashlib.sha256(str(part_path).encode()).hexdigest()[:32]
+        with self._download_locks_lock:
+            thread_lock = self._download_locks.setdefault(key, threading.Lock())
+        with thread_lock, contextlib.ExitStack() as stack:
+            try:
+                lock_dir = _cache_dir() / "downloads"
+                lock_dir.mkdir(parents=True, exist_ok=True)
+                lock_handle = stack.enter_context(open(lock_dir / f"{key}.lock", "a+", encoding="utf-8"))
+            except OSError:
+                lock_handle = None  # No shared cache dir: only threads of this process are excluded.
+            if lock_handle is not None and fcntl is not None:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX)  # Released when the handle closes.
+            yield
+
+    def _probe_download(self, file_url: str, timeout: int) -> tuple[int | None, str, bool]:
+        try:
+            response = self._send(
+                lambda: self.session.head(file_url, allow_redirects=True, timeout=timeout), idempotent=True
+            )
+        except requests.RequestException:
+            return None, "", False
+        with response:
+            if not response.ok:
+                return None, "", False
+            length = response.headers.get("Content-Length")
+            size = int(length) if length and length.isdigit() else None
+            ranged = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+            return size, response.headers.get("ETag", ""), ranged
+
+    def _download_stream(
+        self, file_url: str, part_path: pathlib.Path, timeout: int, meter: _ProgressMeter, *, ranged: bool
+    ) -> None:
+        with part_path.open("wb") as handle:
+            self._fetch_into(handle, file_url, 0, None, timeout, meter, resumable=ranged)
+
+    def _fetch_into(
+        self,
+        handle: BinaryIO,
+        file_url: str,
+        start: int,
+        end: int | None,
+        timeout: int,
+        meter: _ProgressMeter | None,
+        *,
+        resumable: bool = True,
+    ) -> int:
+        """Write bytes start..end (None: to the end) of file_url into handle at `start`.
+
+        A connection dropped mid-body is re-requested from the first missing
+        byte when `resumable`; returns the number of bytes written.
+        """
+        offset = start
+        attempt = 0
+        while True:
+            headers = {"Range": f"bytes={offset}-{'' if end is None else end}"} if offset or end is not None else {}
+            try:
+                with self._send(
+                    lambda headers=headers: self.session.get(file_url, headers=headers, stream=True, timeout=timeout),
+                    idempotent=True,
+                ) as response:
+                    if response.status_code != (206 if headers else 200):
+                        raise FalClientError(
+                            f"Download failed ({response.status_code}) from {file_url}", response.status_code
+                        )
+                    if meter is not None and not meter.total:
+                        length = response.headers.get("Content-Length")
+                        meter.total = int(length) if length and length.isdigit() else 0
+                    handle.seek(offset)
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        if chunk:
+                            handle.write(chunk)
+                            offset += len(chunk)
+                            if meter is not None:
+                                meter.advance(len(chunk))
+                return offset - start
+            except requests.RequestException as exc:
+                attempt += 1
+                if not resumable or attempt >= self.retry_policy.max_attempts:
+                    raise FalClientError(f"Download interrupted from {file_url}: {exc}") from exc
+                time.sleep(self.retry_policy.backoff(attempt))
+
+    def _download_ranges(
+        self,
+        file_url: str,
+        part_path: pathlib.Path,
+        state_path: pathlib.Path,
+        size: int,
+        etag: str,
+        connections: int,
+        timeout: int,
+        meter: _ProgressMeter,
+    ) -> None:
+        piece_size = DEFAULT_DOWNLOAD_PIECE_SIZE
+        state: dict[str, Any] = {}
+        if state_path.exists() and part_path.exists():
+            try:
+                state = json.loads(state_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                state = {}
+        same_source = state.get("url") == file_url or (etag and state.get("etag") == etag)
+        if not (same_source and state.get("size") == size and state.get("piece_size") == piece_size):
+            state = {"url": file_url, "etag": etag, "size": size, "piece_size": piece_size, "done": []}
+            with part_path.open("wb") as handle:
+                handle.truncate(size)
+        done: set[int] = set(state["done"])
+        total_pieces = -(-size // piece_size)
+        pending = [index for index in range(total_pieces) if index not in done]
+        meter.advance(sum(min(piece_size, size - index * piece_size) for index in done))
+        state_lock = threading.Lock()
+
+        def fetch(index: int) -> None:
+            start = index * piece_size
+            end = min(size, start + piece_size) - 1
+            with part_path.open("r+b") as handle:
+                written = self._fetch_into(handle, file_url, start, end, timeout, None)
+            if written != end - start + 1:
+                raise FalClientError(f"Range download truncated at piece {index} from {file_url}")
+            with state_lock:
+                meter.advance(written)
+                done.add(index)
+                state["done"] = sorted(done)
+                state_path.write_text(json.dumps(state), encoding="utf-8")
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=connections) as executor:
+            for future in concurrent.futures.as_completed([executor.submit(fetch, index) for index in pending]):
+                future.result()
+
+
+_default_client: FalClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> FalClient:
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = FalClient(
+                    upload_cache=default_upload_cache(),
+                    journal=default_job_journal(),
+                    result_cache=default_result_cache(),
+                    rate_limiter=default_rate_limiter(),
+                    route_stats=default_route_stats(),
+                )
+    return _default_client
+
+
+def set_default_client(client: FalClient | None) -> None:
+    global _default_client, _result_cache_client
+    with _default_client_lock:
+        _default_client = client
+        _result_cache_client = None
+
+
+_result_cache_client: FalClient | None = None
+_result_cache_scope: contextvars.ContextVar[bool] = contextvars.ContextVar("fal_result_cache_scope", default=False)
+
+
+def get_result_cache_client() -> FalClient:
+    """The default client, or a sibling sharing its pool and stores plus a ResultCache."""
+    global _result_cache_client
+    client = get_default_client()
+    if client.result_cache is not None:
+        return client
+    with _default_client_lock:
+        if _result_cache_client is None:
+            _result_cache_client = FalClient(
+                session=client.session,
+                upload_cache=client.upload_cache,
+                journal=client.journal,
+                result_cache=ResultCache(),
+                rate_limiter=client.rate_limiter,
+                route_stats=client.route_stats,
+            )
+        return _result_cache_client
+
+
+@contextlib.contextmanager
+def result_cache_scope(enabled: bool = True) -> Iterator[None]:
+    """Route the fal_* calls made in this thread/context through get_result_cache_client().
+
+    Lets one caller opt into result caching without changing the shared
+    default client for everyone else in the process.
+    """
+    token = _result_cache_scope.set(enabled)
+    try:
+        yield
+    finally:
+        _result_cache_scope.reset(token)
+
+
+def _call_client() -> FalClient:
+    return get_result_cache_client() if _result_cache_scope.get() else get_default_client()
+
+
+def fal_retry_stats() -> dict[str, Any]:
+    client = get_default_client()
+    with client._retry_lock:
+        return client.retry_stats.as_dict()
+
+
+def fal_endpoint_health() -> list[dict[str, Any]]:
+    router = get_default_client().router
+    return router.snapshot() if router is not None else []
+
+
+def fal_rate_limit_stats() -> dict[str, dict[str, Any]]:
+    limiter = get_default_client().rate_limiter
+    return limiter.stats_dict() if limiter is not None else {}
+
+
+def _daemon_proxy() -> Any | None:
+    """fal_daemon proxy when a resident daemon is running and MAX_FAL_DAEMON=1 opts in."""
+    if not _env_flag("MAX_FAL_DAEMON", default=False):
+        return None
+    from fal_daemon import connect_daemon  # Imported lazily: fal_daemon imports this module.
+
+    return connect_daemon()
+
+
+def _wants_result_cache() -> bool:
+    if _result_cache_scope.get():
+        return True
+    client = _default_client
+    if client is not None:
+        return client.result_cache is not None
+    return _env_flag("MAX_FAL_RESULT_CACHE", default=False)
+
+
+def _forward(
     method: str,
-    url: str,
-    headers: dict[str, str],
-    *,
-    json_payload: Any | None = None,
-    timeout: int = 120,
+    args: list[Any],
+    kwargs: dict[str, Any],
+    local: Callable[[], Any],
+    **callbacks: Any,
 ) -> Any:
-    response = requests.request(method, url, headers=headers, json=json_payload, timeout=timeout)
+    """Run `method` on the resident daemon when one serves this environment, else call `local`."""
+    proxy = _daemon_proxy()
+    if proxy is None:
+        return local()
+    from fal_daemon import DaemonUnavailable
+
+    if "api_key" in kwargs:
+        # The daemon runs with its own environment, so send this process's API key along.
+        kwargs["api_key"] = _require_api_key(kwargs.get("api_key"))
     try:
-        payload = response.json() if response.text else {}
-    except ValueError as exc:
-        raise FalClientError(f"Invalid JSON response ({response.status_code})", response.status_code) from exc
-
-    if not response.ok:
-        raise FalClientError(
-            f"HTTP {response.status_code}: {_extract_error_message(payload)}",
-            status_code=response.status_code,
-            payload=payload,
+        return proxy.call(
+            method,
+            args,
+            kwargs,
+            callbacks=callbacks,
+            result_cache=_wants_result_cache(),
+            environment=_daemon_environment(),
         )
-    return payload
+    except DaemonUnavailable:
+        return local()  # Rejected before it ran, e.g. the daemon was started with other settings.
 
 
-def fal_run(model_path: str, payload: dict[str, Any], *, api_key: str | None = None, base_url: str | None = None) -> Any:
-    encoded = _encode_model_path(model_path)
-    url = f"{_base_url(base_url)}/api/fal/run/{encoded}"
-    return _request_json("POST", url, _headers(api_key), json_payload=payload)
+def fal_run(
+    model_path: str,
+    payload: dict[str, Any],
+    *,
+    api_key: str | None = None,
+    base_url: str | None = None,
+    bypass_cache: bool = False,
+) -> Any:
+    return _forward(
+        "run",
+        [model_path, payload],
+        {"api_key": api_key, "base_url": base_url, "bypass_cache": bypass_cache},
+        lambda: _call_client().run(model_path, payload, api_key=api_key, base_url=base_url, bypass_cache=bypass_cache),
+    )
 
 
 def fal_queue_submit(
@@ -99,10 +2433,17 @@ def fal_queue_submit(
     *,
     api_key: str | None = None,
     base_url: str | None = None,
+    resume: bool = False,
+    bypass_cache: bool = False,
 ) -> Any:
-    encoded = _encode_model_path(model_path)
-    url = f"{_base_url(base_url)}/api/fal/queue/{encoded}"
-    return _request_json("POST", url, _headers(api_key), json_payload=payload)
+    return _forward(
+        "queue_submit",
+        [model_path, payload],
+        {"api_key": api_key, "base_url": base_url, "resume": resume, "bypass_cache": bypass_cache},
+        lambda: _call_client().queue_submit(
+            model_path, payload, api_key=api_key, base_url=base_url, resume=resume, bypass_cache=bypass_cache
+        ),
+    )
 
 
 def fal_queue_status(
@@ -112,10 +2453,12 @@ def fal_queue_status(
     api_key: str | None = None,
     base_url: str | None = None,
 ) -> Any:
-    encoded_model = _encode_model_path(model_path)
-    encoded_request = quote(request_id, safe="")
-    url = f"{_base_url(base_url)}/api/fal/queue/{encoded_model}/requests/{encoded_request}/status"
-    return _request_json("GET", url, _headers(api_key, content_type_json=False))
+    return _forward(
+        "queue_status",
+        [model_path, request_id],
+        {"api_key": api_key, "base_url": base_url},
+        lambda: _call_client().queue_status(model_path, request_id, api_key=api_key, base_url=base_url),
+    )
 
 
 def fal_queue_result(
@@ -125,10 +2468,12 @@ def fal_queue_result(
     api_key: str | None = None,
     base_url: str | None = None,
 ) -> Any:
-    encoded_model = _encode_model_path(model_path)
-    encoded_request = quote(request_id, safe="")
-    url = f"{_base_url(base_url)}/api/fal/queue/{encoded_model}/requests/{encoded_request}"
-    return _request_json("GET", url, _headers(api_key, content_type_json=False))
+    return _forward(
+        "queue_result",
+        [model_path, request_id],
+        {"api_key": api_key, "base_url": base_url},
+        lambda: _call_client().queue_result(model_path, request_id, api_key=api_key, base_url=base_url),
+    )
 
 
 def fal_queue_wait(
@@ -138,73 +2483,387 @@ def fal_queue_wait(
     api_key: str | None = None,
     base_url: str | None = None,
     max_wait_seconds: int = 20 * 60,
-    poll_interval_seconds: int = 3,
+    poll_interval_seconds: float = 3,
+    poll_schedule: PollSchedule | None = None,
     on_status: Callable[[str, Any, int], None] | None = None,
+    stream: bool | None = None,
+    cancel_on_timeout: bool = True,
 ) -> Any:
-    started = time.time()
-    last_status = ""
-    while time.time() - started < max_wait_seconds:
-        status_payload = fal_queue_status(model_path, request_id, api_key=api_key, base_url=base_url)
-        status = str(status_payload.get("status", "")).upper()
-        elapsed = int(time.time() - started)
-        if status and status != last_status:
-            if on_status is not None:
-                on_status(status, status_payload, elapsed)
-            last_status = status
-        if status == "COMPLETED":
-            return status_payload
-        if status in {"FAILED", "CANCELLED", "ERROR"}:
-            raise FalClientError(f"Queue failed with status {status}: {_extract_error_message(status_payload)}")
-        time.sleep(poll_interval_seconds)
-    raise FalClientError(f"Queue wait timeout after {max_wait_seconds} seconds")
-
-
-def fal_upload_file(file_path: str, *, api_key: str | None = None, base_url: str | None = None) -> str:
-    abs_path = pathlib.Path(file_path).expanduser().resolve()
-    if not abs_path.exists():
-        raise FalClientError(f"File not found: {abs_path}")
-
-    mime_type, _ = mimetypes.guess_type(str(abs_path))
-    url = f"{_base_url(base_url)}/api/fal/files/upload"
-    headers = _headers(api_key, content_type_json=False)
-
-    with abs_path.open("rb") as handle:
-        response = requests.post(
-            url,
-            headers=headers,
-            files={"file": (abs_path.name, handle, mime_type or "application/octet-stream")},
-            timeout=300,
-        )
+    options = {
+        "api_key": api_key,
+        "base_url": base_url,
+        "max_wait_seconds": max_wait_seconds,
+        "poll_interval_seconds": poll_interval_seconds,
+        "poll_schedule": asdict(poll_schedule) if poll_schedule is not None else None,
+        "stream": stream,
+        "cancel_on_timeout": cancel_on_timeout,
+    }
+    return _forward(
+        "queue_wait",
+        [model_path, request_id],
+        options,
+        lambda: _call_client().queue_wait(
+            model_path,
+            request_id,
+            api_key=api_key,
+            base_url=base_url,
+            max_wait_seconds=max_wait_seconds,
+            poll_interval_seconds=poll_interval_seconds,
+            poll_schedule=poll_schedule,
+            on_status=on_status,
+            stream=stream,
+            cancel_on_timeout=cancel_on_timeout,
+        ),
+        on_status=on_status,
+    )
 
-    try:
-        payload = response.json() if response.text else {}
-    except ValueError:
-        payload = {"message": response.text[:200]}
-
-    if not response.ok:
-        if response.status_code == 404:
-            raise FalClientError("FAL upload proxy is not available. Expected endpoint: /api/fal/files/upload", 404)
-        raise FalClientError(
-            f"Upload failed ({response.status_code}): {_extract_error_message(payload)}",
-            status_code=response.status_code,
-            payload=payload,
-        )
 
-    file_url = payload.get("file_url") or payload.get("url") or payload.get("data", {}).get("url")
-    if not file_url:
-        raise FalClientError(f"Upload response missing file_url: {payload}")
-    return str(file_url)
+def fal_queue_cancel(
+    model_path: str,
+    request_id: str,
+    *,
+    api_key: str | None = None,
+    base_url: str | None = None,
+) -> Any:
+    return _forward(
+        "queue_cancel",
+        [model_path, request_id],
+        {"api_key": api_key, "base_url": base_url},
+        lambda: _call_client().queue_cancel(model_path, request_id, api_key=api_key, base_url=base_url),
+    )
+
+
+def fal_cancel_pending() -> int:
+    # Local: the journal is a shared file, so there is nothing to gain from the daemon.
+    return get_default_client().cancel_pending()
+
 
+def fal_upload_file(
+    file_path: str,
+    *,
+    api_key: str | None = None,
+    base_url: str | None = None,
+    use_cache: bool = True,
+    on_progress: ProgressCallback | None = None,
+) -> str:
+    return _forward(
+        "upload_file",
+        [str(pathlib.Path(file_path).expanduser().resolve())],
+        {"api_key": api_key, "base_url": base_url, "use_cache": use_cache},
+        lambda: _call_client().upload_file(
+            file_path, api_key=api_key, base_url=base_url, use_cache=use_cache, on_progress=on_progress
+        ),
+        on_progress=on_progress,
+    )
+
+
+def fal_upload_data(
+    data: UploadData,
+    content_type: str,
+    *,
+    file_name: str | None = None,
+    api_key: str | None = None,
+    base_url: str | None = None,
+    use_cache: bool = True,
+    on_progress: ProgressCallback | None = None,
+) -> str:
+    # In-memory content is not forwarded to a resident daemon; it shares the upload cache on disk anyway.
+    return _call_client().upload_data(
+        data,
+        content_type,
+        file_name=file_name,
+        api_key=api_key,
+        base_url=base_url,
+        use_cache=use_cache,
+        on_progress=on_progress,
+    )
+
+
+def download_to_file(
+    file_url: str,
+    output_path: str,
+    *,
+    timeout: int = 300,
+    connections: int = DEFAULT_DOWNLOAD_CONNECTIONS,
+    sha256: str | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> str:
+    return _forward(
+        "download_to_file",
+        [file_url, str(pathlib.Path(output_path).expanduser().resolve())],
+        {"timeout": timeout, "connections": connections, "sha256": sha256},
+        lambda: _call_client().download_to_file(
+            file_url, output_path, timeout=timeout, connections=connections, sha256=sha256, on_progress=on_progress
+        ),
+        on_progress=on_progress,
+    )
 
-def download_to_file(file_url: str, output_path: str, *, timeout: int = 300) -> str:
-    response = requests.get(file_url, stream=True, timeout=timeout)
-    if response.status_code != 200:
-        raise FalClientError(f"Download failed ({response.status_code}) from {file_url}", response.status_code)
 
-    output = pathlib.Path(output_path).expanduser().resolve()
-    output.parent.mkdir(parents=True, exist_ok=True)
-    with output.open("wb") as handle:
-        for chunk in response.iter_content(chunk_size=1024 * 1024):
-            if chunk:
-                handle.write(chunk)
-    return str(output)
+@dataclass
+class FalJob:
+    model_path: str
+    payload: dict[str, Any]
+    future: concurrent.futures.Future = field(default_factory=concurrent.futures.Future, repr=False)
+    request_id: str = ""
+    status: str = "PENDING"
+    created_at: float = field(default_factory=time.time)
+    submitted_at: float | None = None
+    completed_at: float | None = None
+    polls: int = 0
+    state_polls: int = 0
+    next_poll_at: float = 0.0
+    progress: QueueProgress = field(default_factory=QueueProgress, repr=False)
+    abandoned: bool = field(default=False, repr=False)
+
+    def result(self, timeout: float | None = None) -> Any:
+        return self.future.result(timeout)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+
+class FalJobPool:
+    """Run many queue jobs from one scheduler thread.
+
+    At most `max_in_flight` jobs are submitted at once overall and at most
+    `per_model_limit` (or `model_limits[model_path]`) per model; the rest wait
+    locally. One loop polls every in-flight request_id on its own adaptive
+    schedule and resolves each job's future with the queue result. job.progress
+    tracks queue position and ETA; on_status(job, status, payload) fires on
+    status changes and when the position or progress moves. Jobs that time
+    out or are abandoned, including every unfinished job when the `with` block
+    exits on an exception (e.g. Ctrl-C), are cancelled remotely unless
+    cancel_abandoned=False:
+
+        with FalJobPool(max_in_flight=20, per_model_limit=5) as pool:
+            for model_path, payload in jobs:
+                pool.submit(model_path, payload)
+            for job in pool.as_completed():
+                print(job.request_id, job.result())
+    """
+
+    def __init__(
+        self,
+        client: FalClient | None = None,
+        *,
+        max_in_flight: int = 16,
+        per_model_limit: int = 4,
+        model_limits: dict[str, int] | None = None,
+        poll_schedule: PollSchedule | None = None,
+        max_wait_seconds: int = 20 * 60,
+        resume: bool = False,
+        on_status: Callable[[FalJob, str, Any], None] | None = None,
+        cancel_abandoned: bool = True,
+    ):
+        self.client = client or _call_client()
+        self.resume = resume
+        self.cancel_abandoned = cancel_abandoned
+        self.max_in_flight = max_in_flight
+        self.per_model_limit = per_model_limit
+        self.model_limits = dict(model_limits or {})
+        self.poll_schedule = poll_schedule or PollSchedule()
+        self.max_wait_seconds = max_wait_seconds
+        self.on_status = on_status
+        self._jobs: list[FalJob] = []
+        self._waiting: list[FalJob] = []
+        self._in_flight: list[FalJob] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="fal-job-pool", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> FalJobPool:
+        return self
+
+    def __exit__(self, exc_type: Any, *_exc: Any) -> None:
+        if exc_type is not None:
+            with self._cond:
+                unfinished = [job for job in self._jobs if not job.done()]
+            for job in unfinished:
+                self.abandon(job)
+        self.shutdown(wait=True)
+
+    def submit(self, model_path: str, payload: dict[str, Any]) -> FalJob:
+        job = FalJob(model_path, payload)
+        with self._cond:
+            if self._closed:
+                raise FalClientError("FalJobPool is shut down")
+            self._jobs.append(job)
+            self._waiting.append(job)
+            self._cond.notify_all()
+        return job
+
+    def as_completed(self, jobs: list[FalJob] | None = None, timeout: float | None = None) -> Iterator[FalJob]:
+        with self._cond:
+            selected = list(jobs if jobs is not None else self._jobs)
+        by_future = {job.future: job for job in selected}
+        for future in concurrent.futures.as_completed(by_future, timeout=timeout):
+            yield by_future[future]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs; with wait=False, jobs not yet submitted are cancelled."""
+        with self._cond:
+            self._closed = True
+            if not wait:
+                for job in self._waiting:
+                    job.status = "CANCELLED"
+                    job.future.cancel()
+                self._waiting.clear()
+            self._cond.notify_all()
+        if wait:
+            self._thread.join()
+
+    def abandon(self, job: FalJob) -> bool:
+        """Stop tracking an unfinished job, e.g. a race loser; True if it was cancelled remotely."""
+        with self._cond:
+            if job.done():
+                return False
+            if job in self._waiting:
+                self._waiting.remove(job)
+                job.status = "CANCELLED"
+                job.future.cancel()
+                return False
+            # A job inside queue_submit has no request_id yet; _submit_job cancels it once one arrives.
+            job.abandoned = True
+            submitting = not job.request_id
+            self._set_status(job, "ABANDONED", {})
+        self._finish(job, error=FalClientError(f"Job {job.request_id or job.model_path} abandoned"))
+        if submitting or not self.cancel_abandoned:
+            return False
+        try:
+            outcome = self.client.queue_cancel(job.model_path, job.request_id)
+        except FalClientError:
+            return False
+        # job.status says what became of it remotely: CANCELLED, COMPLETED (too late) or ABANDONED.
+        remote = outcome.get("status") if isinstance(outcome, dict) else None
+        if remote == "ALREADY_COMPLETED":
+            job.status = "COMPLETED"
+        elif remote == "CANCELLATION_REQUESTED":
+            job.status = "CANCELLED"
+        return job.status == "CANCELLED"
+
+    def _limit_for(self, model_path: str) -> int:
+        return self.model_limits.get(model_path, self.per_model_limit)
+
+    def _take_submittable(self) -> list[FalJob]:
+        ready = []
+        for job in list(self._waiting):
+            if len(self._in_flight) + len(ready) >= self.max_in_flight:
+                break
+            same_model = sum(1 for other in self._in_flight + ready if other.model_path == job.model_path)
+            if same_model >= self._limit_for(job.model_path):
+                continue
+            self._waiting.remove(job)
+            ready.append(job)
+        self._in_flight.extend(ready)
+        return ready
+
+    def _finish(self, job: FalJob, *, result: Any = None, error: BaseException | None = None) -> None:
+        with self._cond:
+            if job.done():
+                return  # Abandoned while its last poll was in flight.
+            job.completed_at = time.time()
+            if job in self._in_flight:
+                self._in_flight.remove(job)
+            self._cond.notify_all()
+            # Resolved under the lock so abandon() and the scheduler cannot both settle it.
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    def _set_status(self, job: FalJob, status: str, payload: Any) -> None:
+        moved = job.progress.observe(status, payload)
+        if status == job.status:
+            job.state_polls += 1
+            if not moved:
+                return
+        else:
+            job.status = status
+            job.state_polls = 1
+            if job.request_id:
+                self.client._record_status(job.request_id, status)
+        if self.on_status is not None:
+            try:
+                self.on_status(job, status, {**payload, "eta": job.progress.as_dict()} if isinstance(payload, dict) else payload)
+            except Exception:  # pylint: disable=broad-except
+                pass  # A failing callback must not kill the scheduler thread and strand every future.
+
+    def _submit_job(self, job: FalJob) -> None:
+        with self._cond:
+            skip = job.abandoned or job.done() or not job.future.set_running_or_notify_cancel()
+            if skip and job in self._in_flight:
+                self._in_flight.remove(job)
+            if job.abandoned:
+                job.status = "CANCELLED"  # Abandoned before it ever reached the queue.
+        if skip:
+            return
+        try:
+            created = self.client.queue_submit(job.model_path, job.payload, resume=self.resume)
+            request_id = created.get("request_id")
+            if not request_id:
+                raise FalClientError(f"Queue submit missing request_id: {created}")
+        except Exception as exc:  # pylint: disable=broad-except
+            self._finish(job, error=exc)
+            return
+        with self._cond:
+            job.request_id = str(request_id)
+            abandoned = job.abandoned
+        if abandoned:
+            # abandon() ran while queue_submit was in flight and could not cancel it yet.
+            if self.cancel_abandoned and self.client.cancel_quietly(job.model_path, job.request_id):
+                job.status = "CANCELLED"
+            return
+        job.submitted_at = time.time()
+        job.progress.run_seconds_hint = self.client._run_seconds_hint(job.model_path)
+        job.next_poll_at = time.monotonic() + self.poll_schedule.initial_interval
+        self._set_status(job, "SUBMITTED", created)
+
+    def _poll_job(self, job: FalJob) -> None:
+        try:
+            status_payload, response_headers = self.client._queue_status(job.model_path, job.request_id)
+            job.polls += 1
+            status = str(status_payload.get("status", "")).upper()
+            self._set_status(job, status, status_payload)
+            if status == "COMPLETED":
+                self._finish(job, result=self.client.queue_result(job.model_path, job.request_id))
+                return
+            if status in FAILED_STATUSES:
+                raise FalClientError(f"Queue failed with status {status}: {_extract_error_message(status_payload)}")
+            if job.submitted_at is not None and time.time() - job.submitted_at > self.max_wait_seconds:
+                self.client._record_status(job.request_id, "TIMEOUT")
+                if self.cancel_abandoned:
+                    self.client.cancel_quietly(job.model_path, job.request_id)
+                raise FalClientError(f"Queue wait timeout after {self.max_wait_seconds} seconds")
+        except Exception as exc:  # pylint: disable=broad-except
+            self._finish(job, error=exc)
+            return
+        retry_after = _parse_retry_after(response_headers.get("Retry-After"))
+        if retry_after is None:
+            retry_after = _parse_retry_after(status_payload.get("retry_after"))
+        delay = self.poll_schedule.next_delay(
+            status, status_payload, polls=job.polls, state_polls=job.state_polls, retry_after=retry_after
+        )
+        job.next_poll_at = time.monotonic() + delay
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                to_submit = self._take_submittable()
+                if not to_submit and not self._in_flight and not self._waiting and self._closed:
+                    return
+            for job in to_submit:
+                self._submit_job(job)
+            with self._cond:
+                active = [job for job in self._in_flight if job.request_id]
+            now = time.monotonic()
+            finished = 0
+            for job in active:
+                if job.next_poll_at <= now and not job.done():
+                    self._poll_job(job)
+                    finished += job.done()
+            with self._cond:
+                if to_submit or finished:
+                    continue
+                upcoming = [job.next_poll_at for job in self._in_flight if job.request_id]
+                self._cond.wait(max(0.0, min(upcoming) - time.monotonic()) if upcoming else None)
@@ -0,0 +1,350 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.10"
+# dependencies = ["requests", "aiohttp"]
+# ///
+
+"""
+Asyncio variant of the FAL queue API.
+
+Mirrors fal_queue_submit / fal_queue_status / fal_queue_result / fal_queue_cancel /
+fal_queue_wait / fal_upload_file / download_to_file so that hundreds of request_ids can be driven
+from one event loop over a shared aiohttp connection pool:
+
+    async with AsyncFalClient(max_concurrency=32) as client:
+        created = await asyncio.gather(*(client.queue_submit(model, p) for p in payloads))
+        await asyncio.gather(*(client.queue_wait(model, c["request_id"]) for c in created))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import mimetypes
+import os
+import pathlib
+import time
+from urllib.parse import quote
+from typing import Any, Callable
+
+import aiohttp
+
+from fal_client import (
+    FAILED_STATUSES,
+    FalClientError,
+    PollSchedule,
+    PollStats,
+    QueueProgress,
+    _base_url,
+    _encode_model_path,
+    _extract_error_message,
+    _headers,
+    _parse_retry_after,
+)
+
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_CONNECTION_LIMIT = 64
+
+
+class AsyncFalClient:
+    """FAL proxy client sharing one aiohttp session across coroutines.
+
+    `max_concurrency` bounds HTTP requests in flight (not jobs being waited on),
+    so a queue wait only holds a slot while its status request is outstanding.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+        session: aiohttp.ClientSession | None = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self._connection_limit = connection_limit
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self._connection_limit, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> AsyncFalClient:
+        return self
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        await self.close()
+
+    def _base_url(self, base_url: str | None = None) -> str:
+        return _base_url(base_url or self.base_url)
+
+    def _headers(self, api_key: str | None = None, content_type_json: bool = True) -> dict[str, str]:
+        return _headers(api_key or self.api_key, content_type_json=content_type_json)
+
+    async def _request_json(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        *,
+        json_payload: Any | None = None,
+        timeout: int = 120,
+    ) -> Any:
+        return (await self._request(method, url, headers, json_payload=json_payload, timeout=timeout))[0]
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        *,
+        json_payload: Any | None = None,
+        timeout: int = 120,
+    ) -> tuple[Any, Any]:
+        async with self._semaphore:
+            async with self.session.request(
+                method,
+                url,
+                headers=headers,
+                json=json_payload,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                text = await response.text()
+                status_code = response.status
+                response_headers = response.headers
+        try:
+            payload = json.loads(text) if text else {}
+        except ValueError as exc:
+            raise FalClientError(f"Invalid JSON response ({status_code})", status_code) from exc
+
+        if status_code >= 400:
+            raise FalClientError(
+                f"HTTP {status_code}: {_extract_error_message(payload)}",
+                status_code=status_code,
+                payload=payload,
+            )
+        return payload, response_headers
+
+    async def run(self, model_path: str, payload: dict[str, Any], *, api_key: str | None = None, base_url: str | None = None) -> Any:
+        encoded = _encode_model_path(model_path)
+        url = f"{self._base_url(base_url)}/api/fal/run/{encoded}"
+        return await self._request_json("POST", url, self._headers(api_key), json_payload=payload)
+
+    async def queue_submit(
+        self,
+        model_path: str,
+        payload: dict[str, Any],
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> Any:
+        encoded = _encode_model_path(model_path)
+        url = f"{self._base_url(base_url)}/api/fal/queue/{encoded}"
+        return await self._request_json("POST", url, self._headers(api_key), json_payload=payload)
+
+    async def queue_status(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> Any:
+        return (await self._queue_status(model_path, request_id, api_key=api_key, base_url=base_url))[0]
+
+    async def _queue_status(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> tuple[Any, Any]:
+        encoded_model = _encode_model_path(model_path)
+        encoded_request = quote(request_id, safe="")
+        url = f"{self._base_url(base_url)}/api/fal/queue/{encoded_model}/requests/{encoded_request}/status"
+        return await self._request("GET", url, self._headers(api_key, content_type_json=False))
+
+    async def queue_result(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> Any:
+        encoded_model = _encode_model_path(model_path)
+        encoded_request = quote(request_id, safe="")
+        url = f"{self._base_url(base_url)}/api/fal/queue/{encoded_model}/requests/{encoded_request}"
+        return await self._request_json("GET", url, self._headers(api_key, content_type_json=False))
+
+    async def queue_cancel(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> Any:
+        """Ask the proxy to cancel a queued or running job.
+
+        Returns {"status": "CANCELLATION_REQUESTED"} or {"status": "ALREADY_COMPLETED"}.
+        Unlike FalClient.queue_cancel nothing is journalled; failed cancels raise.
+        """
+        encoded_model = _encode_model_path(model_path)
+        encoded_request = quote(request_id, safe="")
+        url = f"{self._base_url(base_url)}/api/fal/queue/{encoded_model}/requests/{encoded_request}/cancel"
+        try:
+            return await self._request_json("PUT", url, self._headers(api_key, content_type_json=False))
+        except FalClientError as exc:
+            if exc.status_code == 400 and isinstance(exc.payload, dict) and exc.payload.get("status") == "ALREADY_COMPLETED":
+                return exc.payload
+            raise
+        except aiohttp.ClientError as exc:
+            raise FalClientError(f"Cancel failed for {request_id}: {exc}") from exc
+
+    async def cancel_quietly(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> bool:
+        """Best-effort queue_cancel for cleanup paths; True when a cancel was accepted."""
+        try:
+            outcome = await self.queue_cancel(model_path, request_id, api_key=api_key, base_url=base_url)
+        except (FalClientError, asyncio.TimeoutError):
+            return False
+        return isinstance(outcome, dict) and outcome.get("status") == "CANCELLATION_REQUESTED"
+
+    async def queue_wait(
+        self,
+        model_path: str,
+        request_id: str,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        max_wait_seconds: int = 20 * 60,
+        poll_interval_seconds: float = 3,
+        poll_schedule: PollSchedule | None = None,
+        on_status: Callable[[str, Any, int], None] | None = None,
+        cancel_on_timeout: bool = True,
+    ) -> Any:
+        """Poll a queue job until it completes; see FalClient.queue_wait.
+
+        on_status payloads carry "poll" and "eta" entries as in the sync client
+        and also fire when queue_position or progress moves. A job still
+        unfinished after max_wait_seconds is cancelled (best effort) unless
+        cancel_on_timeout=False.
+        """
+        schedule = poll_schedule or PollSchedule(queued_interval=poll_interval_seconds)
+        stats = PollStats()
+        progress = QueueProgress()
+        started = time.time()
+        last_status = ""
+        state_polls = 0
+        while time.time() - started < max_wait_seconds:
+            status_payload, response_headers = await self._queue_status(
+                model_path, request_id, api_key=api_key, base_url=base_url
+            )
+            stats.calls += 1
+            status = str(status_payload.get("status", "")).upper()
+            elapsed = int(time.time() - started)
+            state_polls = state_polls + 1 if status == last_status else 1
+            moved = progress.observe(status, status_payload)
+            if status and (status != last_status or moved) and on_status is not None:
+                on_status(status, {**status_payload, "poll": stats.as_dict(), "eta": progress.as_dict()}, elapsed)
+            if status:
+                last_status = status
+            if status == "COMPLETED":
+                return status_payload
+            if status in FAILED_STATUSES:
+                raise FalClientError(f"Queue failed with status {status}: {_extract_error_message(status_payload)}")
+            retry_after = _parse_retry_after(response_headers.get("Retry-After"))
+            if retry_after is None:
+                retry_after = _parse_retry_after(status_payload.get("retry_after"))
+            delay = schedule.next_delay(
+                status, status_payload, polls=stats.calls, state_polls=state_polls, retry_after=retry_after
+            )
+            delay = max(0.0, min(delay, max_wait_seconds - (time.time() - started)))
+            stats.last_interval = delay
+            stats.sleep_seconds += delay
+            stats.intervals.append(delay)
+            await asyncio.sleep(delay)
+        if cancel_on_timeout:
+            await self.cancel_quietly(model_path, request_id, api_key=api_key, base_url=base_url)
+        raise FalClientError(f"Queue wait timeout after {max_wait_seconds} seconds")
+
+    async def upload_file(self, file_path: str, *, api_key: str | None = None, base_url: str | None = None) -> str:
+        abs_path = pathlib.Path(file_path).expanduser().resolve()
+        if not abs_path.exists():
+            raise FalClientError(f"File not found: {abs_path}")
+
+        mime_type, _ = mimetypes.guess_type(str(abs_path))
+        url = f"{self._base_url(base_url)}/api/fal/files/upload"
+        headers = self._headers(api_key, content_type_json=False)
+
+        async with self._semaphore:
+            with abs_path.open("rb") as handle:
+                form = aiohttp.FormData()
+                form.add_field("file", handle, filename=abs_path.name, content_type=mime_type or "application/octet-stream")
+                async with self.session.post(
+                    url,
+                    headers=headers,
+                    data=form,
+                    timeout=aiohttp.ClientTimeout(total=300),
+                ) as response:
+                    text = await response.text()
+                    status_code = response.status
+
+        try:
+            payload = json.loads(text) if text else {}
+        except ValueError:
+            payload = {"message": text[:200]}
+
+        if status_code >= 400:
+            if status_code == 404:
+                raise FalClientError("FAL upload proxy is not available. Expected endpoint: /api/fal/files/upload", 404)
+            raise FalClientError(
+                f"Upload failed ({status_code}): {_extract_error_message(payload)}",
+                status_code=status_code,
+                payload=payload,
+            )
+
+        file_url = payload.get("file_url") or payload.get("url") or payload.get("data", {}).get("url")
+        if not file_url:
+            raise FalClientError(f"Upload response missing file_url: {payload}")
+        return str(file_url)
+
+    async def download_to_file(self, file_url: str, output_path: str, *, timeout: int = 300) -> str:
+        """Download into `<output>.part` and rename into place once complete."""
+        output = pathlib.Path(output_path).expanduser().resolve()
+        part_path = output.with_name(output.name + ".part")
+        async with self._semaphore:
+            async with self.session.get(file_url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status != 200:
+                    raise FalClientError(f"Download failed ({response.status}) from {file_url}", response.status)
+
+                output.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    with part_path.open("wb") as handle:
+                        async for chunk in response.content.iter_chunked(1024 * 1024):
+                            await asyncio.to_thread(handle.write, chunk)
+                except BaseException:
+                    part_path.unlink(missing_ok=True)  # A truncated body never reaches output_path.
+                    raise
+        os.replace(part_path, output)
+        return str(output)
@@ -0,0 +1,354 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.10"
+# dependencies = ["requests"]
+# ///
+
+"""
+Resident FAL worker daemon.
+
+Keeps one FalClient (keep-alive connection pool, upload cache, job journal,
+rate limiter, endpoint health) alive behind a Unix socket. While it runs and
+the caller opts in with MAX_FAL_DAEMON=1, the module-level fal_* functions in
+fal_client.py forward to it instead of doing the HTTP work in the calling
+process, so short CLI invocations reuse warm TLS connections and in-memory
+state. Interpreter and `uv run` startup of the calling CLI are not avoided.
+A call is only forwarded when the caller's MAX_API_BASE_URL, cache dir and
+MAX_FAL_* settings match the daemon's own; otherwise it runs in the calling
+process.
+
+Usage:
+    uv run skills/_shared/fal_daemon.py serve [--idle-timeout 1800]
+    MAX_FAL_DAEMON=1 uv run skills/video-gen/video-gen.py --prompt ...
+    uv run skills/_shared/fal_daemon.py status
+    uv run skills/_shared/fal_daemon.py stop
+
+Protocol: one JSON line per connection, {"method", "args", "kwargs",
+"callbacks", "result_cache", "environment"}; the daemon answers with zero or
+more {"event", "args"} lines for callbacks and a final {"result"} or {"error"}
+line. An error with "unavailable": true means the call was not run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Any, Callable
+
+from fal_client import (
+    FalClient,
+    FalClientError,
+    PollSchedule,
+    _cache_dir,
+    _daemon_environment,
+    fal_endpoint_health,
+    fal_rate_limit_stats,
+    fal_retry_stats,
+    get_default_client,
+    get_result_cache_client,
+)
+
+DEFAULT_IDLE_TIMEOUT_SECONDS = 30 * 60
+CONNECT_TIMEOUT = 0.5
+REPROBE_SECONDS = 30.0
+
+FORWARDED_METHODS = frozenset(
+    {
+        "run",
+        "queue_submit",
+        "queue_status",
+        "queue_result",
+        "queue_wait",
+        "queue_cancel",
+        "upload_file",
+        "download_to_file",
+    }
+)
+
+
+class DaemonUnavailable(FalClientError):
+    """The daemon did not run the call, so the caller can safely run it locally."""
+
+
+def daemon_socket_path(create: bool = True) -> pathlib.Path:
+    value = os.environ.get("MAX_FAL_DAEMON_SOCKET")
+    return pathlib.Path(value).expanduser() if value else _cache_dir(create) / "daemon.sock"
+
+
+class DaemonProxy:
+    """Client side of the daemon socket; one connection per call."""
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+
+    def _connect(self, timeout: float | None) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(self.path))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def call(
+        self,
+        method: str,
+        args: list[Any],
+        kwargs: dict[str, Any],
+        *,
+        callbacks: dict[str, Callable[..., None] | None] | None = None,
+        result_cache: bool = False,
+        environment: dict[str, str] | None = None,
+    ) -> Any:
+        active = {name: fn for name, fn in (callbacks or {}).items() if fn is not None}
+        request = {
+            "method": method,
+            "args": args,
+            "kwargs": kwargs,
+            "callbacks": sorted(active),
+            "result_cache": result_cache,
+            "environment": environment or {},
+        }
+        try:
+            sock = self._connect(CONNECT_TIMEOUT)
+        except OSError as exc:
+            forget_daemon(self)  # Idle exit or crash: re-probe later instead of failing every call.
+            raise DaemonUnavailable(f"FAL daemon unavailable at {self.path}: {exc}") from exc
+        with sock:
+            sock.settimeout(None)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("r", encoding="utf-8") as reader:
+                for line in reader:
+                    message = json.loads(line)
+                    if "event" in message:
+                        active[message["event"]](*message.get("args", []))
+                        continue
+                    if message.get("unavailable"):
+                        raise DaemonUnavailable(message["error"])
+                    if "error" in message:
+                        raise FalClientError(message["error"], message.get("status_code"), message.get("payload"))
+                    return message.get("result")
+        raise FalClientError("FAL daemon closed the connection without a response")
+
+    def ping(self) -> bool:
+        try:
+            return self.call("ping", [], {}) == "pong"
+        except (FalClientError, OSError, ValueError):
+            return False
+
+
+_proxy: DaemonProxy | None = None
+_proxy_checked_at: float | None = None
+_proxy_lock = threading.Lock()
+
+
+def connect_daemon() -> DaemonProxy | None:
+    """Proxy for a running daemon, re-probed every REPROBE_SECONDS; None when there is none."""
+    global _proxy, _proxy_checked_at
+    checked_at = _proxy_checked_at
+    if checked_at is not None and time.monotonic() - checked_at < REPROBE_SECONDS:
+        return _proxy
+    with _proxy_lock:
+        if _proxy_checked_at is not None and time.monotonic() - _proxy_checked_at < REPROBE_SECONDS:
+            return _proxy
+        # Only probe for the socket: a missing or unwritable cache dir means no daemon.
+        try:
+            path = daemon_socket_path(create=False)
+            running = path.exists()
+        except OSError:
+            running = False
+        _proxy = None
+        if running:
+            proxy = DaemonProxy(path)
+            try:
+                proxy._connect(CONNECT_TIMEOUT).close()
+                _proxy = proxy
+            except OSError:
+                pass  # Stale socket from a daemon that died.
+        _proxy_checked_at = time.monotonic()
+        return _proxy
+
+
+def forget_daemon(proxy: DaemonProxy) -> None:
+    """Drop a proxy whose daemon went away; calls run locally until the next probe."""
+    global _proxy, _proxy_checked_at
+    with _proxy_lock:
+        if _proxy is proxy:
+            _proxy = None
+            _proxy_checked_at = time.monotonic()
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    server: FalDaemonServer
+
+    def handle(self) -> None:
+        self.server.touch()
+        write_lock = threading.Lock()
+
+        def send(message: dict[str, Any]) -> None:
+            data = json.dumps(message).encode("utf-8") + b"\n"
+            with write_lock:
+                self.wfile.write(data)
+                self.wfile.flush()
+
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            send({"result": self.server.dispatch(request, send)})
+        except DaemonUnavailable as exc:
+            send({"error": str(exc), "unavailable": True})
+        except FalClientError as exc:
+            send({"error": str(exc), "status_code": exc.status_code, "payload": exc.payload})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Caller went away (e.g. Ctrl-C); nothing to report to.
+        except Exception as exc:  # pylint: disable=broad-except
+            send({"error": f"{type(exc).__name__}: {exc}"})
+        finally:
+            self.server.touch()
+            if self.server.stopping:
+                # After replying: shutdown() blocks until serve_forever returns.
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class FalDaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: pathlib.Path, *, idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS):
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.started_at = time.time()
+        self.requests_served = 0
+        self.stopping = False
+        self._active = 0
+        self._last_activity = time.time()
+        self._state_lock = threading.Lock()
+        self.client = get_default_client()
+        self.environment = _daemon_environment()
+        super().__init__(str(path), _DaemonHandler)
+        os.chmod(path, 0o600)
+
+    def touch(self) -> None:
+        with self._state_lock:
+            self._last_activity = time.time()
+
+    def _client_for(self, result_cache: bool) -> FalClient:
+        # Same pool and stores, plus the opt-in result cache the caller enabled.
+        return get_result_cache_client() if result_cache else self.client
+
+    def dispatch(self, request: dict[str, Any], send: Callable[[dict[str, Any]], None]) -> Any:
+        method = request.get("method")
+        if method == "ping":
+            return "pong"
+        if method == "stats":
+            return self.stats()
+        if method == "shutdown":
+            self.stopping = True
+            return "stopping"
+        if method not in FORWARDED_METHODS:
+            raise FalClientError(f"Unknown daemon method: {method}")
+        if (request.get("environment") or {}) != self.environment:
+            # Its stores and endpoints come from the daemon's environment, not the caller's.
+            raise DaemonUnavailable("FAL daemon runs with different MAX_API_BASE_URL/MAX_FAL_* settings")
+
+        kwargs = dict(request.get("kwargs") or {})
+        if isinstance(kwargs.get("poll_schedule"), dict):
+            kwargs["poll_schedule"] = PollSchedule(**kwargs["poll_schedule"])
+        for name in request.get("callbacks") or []:
+            kwargs[name] = lambda *args, _name=name: send({"event": _name, "args": list(args)})
+
+        with self._state_lock:
+            self._active += 1
+            self.requests_served += 1
+        try:
+            client = self._client_for(bool(request.get("result_cache")))
+            return getattr(client, method)(*(request.get("args") or []), **kwargs)
+        finally:
+            with self._state_lock:
+                self._active -= 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._state_lock:
+            active = self._active
+        return {
+            "pid": os.getpid(),
+            "socket": str(self.path),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "requests_served": self.requests_served,
+            "active_requests": active,
+            "retries": fal_retry_stats(),
+            "endpoints": fal_endpoint_health(),
+            "rate_limits": fal_rate_limit_stats(),
+        }
+
+    def watch_idle(self) -> None:
+        while self.idle_timeout > 0:
+            time.sleep(min(30.0, self.idle_timeout))
+            with self._state_lock:
+                idle = self._active == 0 and time.time() - self._last_activity >= self.idle_timeout
+            if idle:
+                print(f"[Daemon] Idle for {int(self.idle_timeout)}s, exiting")
+                self.shutdown()
+                return
+
+
+def serve(path: pathlib.Path, idle_timeout: float) -> None:
+    if path.exists():
+        if DaemonProxy(path).ping():
+            raise SystemExit(f"[Daemon] Already running at {path}")
+        path.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    server = FalDaemonServer(path, idle_timeout=idle_timeout)
+    threading.Thread(target=server.watch_idle, name="fal-daemon-idle", daemon=True).start()
+    print(f"[Daemon] Listening on {path} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.client.close()
+        path.unlink(missing_ok=True)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Resident FAL worker daemon")
+    parser.add_argument("command", choices=["serve", "status", "stop"], help="serve in the foreground, or query/stop")
+    parser.add_argument("--socket", default="", help="Socket path (default: MAX_FAL_DAEMON_SOCKET or cache dir)")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT_SECONDS,
+        help="Exit after this many idle seconds (0 = never)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    path = pathlib.Path(args.socket).expanduser() if args.socket else daemon_socket_path()
+    if args.command == "serve":
+        serve(path, args.idle_timeout)
+        return
+    proxy = DaemonProxy(path)
+    if not proxy.ping():
+        print(f"[Daemon] Not running ({path})")
+        sys.exit(1)
+    if args.command == "status":
+        print(json.dumps(proxy.call("stats", [], {}), indent=2))
+    else:
+        proxy.call("shutdown", [], {})
+        print("[Daemon] Stopping")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.10"
+# dependencies = []
+# ///
+
+"""
+Local stand-in for the Maxgent FAL proxy.
+
+Implements the endpoints fal_client.py talks to (run, queue submit/status/
+status stream/result, file upload incl. multipart, media download with Range)
+with configurable latency, queue/run times, error injection and media size,
+so the client and video-gen can be exercised and benchmarked offline.
+
+Usage:
+    uv run skills/_shared/fal_stub_server.py --port 8787 --queue-seconds 3 --run-seconds 5
+    MAX_API_KEY=stub MAX_API_BASE_URL=http://127.0.0.1:8787 uv run skills/video-gen/video-gen.py --prompt test
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import unquote, urlparse
+
+
+@dataclass
+class StubConfig:
+    latency: float = 0.0  # added to every API response
+    queue_seconds: float = 2.0  # time spent IN_QUEUE
+    queue_depth: int = 5  # queue_position reported at submit, counting down to 0
+    run_seconds: float = 3.0  # time spent IN_PROGRESS
+    error_rate: float = 0.0  # share of API requests answered with 503
+    submit_error_rate: float = 0.0  # share of submits answered with 503
+    retry_after: float | None = None  # Retry-After header on status responses
+    media_bytes: int = 4 * 1024 * 1024
+    media_ranges: bool = True
+    sse: bool = True
+    multipart: bool = True
+
+
+@dataclass
+class StubJob:
+    request_id: str
+    model_path: str
+    payload: Any
+    submitted_at: float
+    cancelled: bool = False
+
+    def status(self, config: StubConfig, now: float | None = None) -> dict[str, Any]:
+        elapsed = (now or time.time()) - self.submitted_at
+        if self.cancelled:
+            return {"status": "CANCELLED", "request_id": self.request_id}
+        if elapsed < config.queue_seconds:
+            remaining = 1 - elapsed / config.queue_seconds if config.queue_seconds else 0
+            return {
+                "status": "IN_QUEUE",
+                "request_id": self.request_id,
+                "queue_position": int(config.queue_depth * remaining),
+            }
+        done_at = self.submitted_at + config.queue_seconds + config.run_seconds
+        if elapsed < config.queue_seconds + config.run_seconds:
+            progress = (elapsed - config.queue_seconds) / config.run_seconds if config.run_seconds else 1
+            return {"status": "IN_PROGRESS", "request_id": self.request_id, "progress": round(progress, 3)}
+        return {"status": "COMPLETED", "request_id": self.request_id, "completed_at": done_at}
+
+
+@dataclass
+class StubState:
+    config: StubConfig
+    jobs: dict[str, StubJob] = field(default_factory=dict)
+    uploads: dict[str, bytes] = field(default_factory=dict)
+    multipart: dict[str, dict[int, bytes]] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are separate writes
+    server: StubServer
+
+    def log_message(self, *_args: Any) -> None:
+        pass
+
+    @property
+    def state(self) -> StubState:
+        return self.server.state
+
+    def _read_body(self) -> bytes:
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return bytes(body)
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, status: int, payload: Any, headers: dict[str, str] | None = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _api_preamble(self, kind: str, error_rate: float | None = None) -> bool:
+        """Apply latency/error injection; returns False when an error was sent."""
+        self.state.count(kind)
+        config = self.state.config
+        if config.latency:
+            time.sleep(config.latency)
+        if random.random() < (config.error_rate if error_rate is None else error_rate):
+            self.state.count(f"{kind}_injected_errors")
+            self._send_json(503, {"error": "injected failure"})
+            return False
+        return True
+
+    def _media_url(self, name: str) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/media/{name}"
+
+    def _job(self, request_id: str) -> StubJob | None:
+        job = self.state.jobs.get(request_id)
+        if job is None:
+            self._send_json(404, {"error": f"Unknown request {request_id}"})
+        return job
+
+    def do_HEAD(self) -> None:
+        path = urlparse(self.path).path
+        if not path.startswith("/media/"):
+            self._send_json(404, {"error": "not found"})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(self.state.config.media_bytes))
+        if self.state.config.media_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"stub-media"')
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if path.startswith("/media/"):
+            self._serve_media()
+            return
+        match = re.match(r"^/api/fal/queue/(.+)/requests/([^/]+)(/status(/stream)?)?$", path)
+        if not match:
+            self._send_json(404, {"error": "not found"})
+            return
+        request_id = unquote(match.group(2))
+        if match.group(4):
+            self._serve_status_stream(request_id)
+            return
+        if not self._api_preamble("status" if match.group(3) else "result"):
+            return
+        job = self._job(request_id)
+        if job is None:
+            return
+        status = job.status(self.state.config)
+        if match.group(3):
+            headers = {}
+            if self.state.config.retry_after is not None:
+                headers["Retry-After"] = str(self.state.config.retry_after)
+            self._send_json(200, status, headers)
+            return
+        if status["status"] != "COMPLETED":
+            self._send_json(400, {"error": f"Request is {status['status']}"})
+            return
+        self._send_json(200, {"video": {"url": self._media_url(f"{request_id}.mp4")}, "seed": 42})
+
+    def do_POST(self) -> None:
+        path = urlparse(self.path).path
+        body = self._read_body()
+        if path == "/api/fal/files/upload":
+            self._handle_upload(body)
+            return
+        if path.startswith("/api/fal/files/upload/multipart"):
+            self._handle_multipart_post(path, body)
+            return
+        run_match = re.match(r"^/api/fal/run/(.+)$", path)
+        if run_match:
+            if not self._api_preamble("run", self.state.config.submit_error_rate):
+                return
+            time.sleep(self.state.config.run_seconds)
+            self._send_json(200, {"video": {"url": self._media_url("run.mp4")}})
+            return
+        queue_match = re.match(r"^/api/fal/queue/(.+)$", path)
+        if queue_match and "/requests/" not in path:
+            if not self._api_preamble("submit", self.state.config.submit_error_rate):
+                return
+            request_id = f"stub-{len(self.state.jobs) + 1}-{random.getrandbits(32):08x}"
+            payload = json.loads(body) if body else {}
+            with self.state.lock:
+                self.state.jobs[request_id] = StubJob(request_id, unquote(queue_match.group(1)), payload, time.time())
+            self._send_json(200, {"request_id": request_id, "status": "IN_QUEUE"})
+            return
+        self._send_json(404, {"error": "not found"})
+
+    def do_PUT(self) -> None:
+        path = urlparse(self.path).path
+        body = self._read_body()
+        cancel_match = re.match(r"^/api/fal/queue/(.+)/requests/([^/]+)/cancel$", path)
+        if cancel_match:
+            if not self._api_preamble("cancel"):
+                return
+            job = self._job(unquote(cancel_match.group(2)))
+            if job is None:
+                return
+            if job.status(self.state.config)["status"] == "COMPLETED":
+                self._send_json(400, {"status": "ALREADY_COMPLETED"})
+                return
+            job.cancelled = True
+            self._send_json(202, {"status": "CANCELLATION_REQUESTED"})
+            return
+        part_match = re.match(r"^/api/fal/files/upload/multipart/([^/]+)/parts/(\d+)$", path)
+        if part_match and self.state.config.multipart:
+            if not self._api_preamble("upload_part"):
+                return
+            upload = self.state.multipart.get(part_match.group(1))
+            if upload is None:
+                self._send_json(404, {"error": "unknown upload"})
+                return
+            upload[int(part_match.group(2))] = body
+            self._send_json(200, {"etag": hashlib.md5(body).hexdigest()})
+            return
+        self._send_json(404, {"error": "not found"})
+
+    def _handle_upload(self, body: bytes) -> None:
+        if not self._api_preamble("upload"):
+            return
+        content = body
+        boundary = re.search(r"boundary=([^;]+)", self.headers.get("Content-Type", ""))
+        if boundary:
+            # Keep only the first part's content; the stub does not need field names.
+            marker = b"--" + boundary.group(1).encode()
+            section = body.split(marker)[1] if marker in body else body
+            content = section.split(b"\r\n\r\n", 1)[-1].rsplit(b"\r\n", 1)[0]
+        name = f"{hashlib.sha256(content).hexdigest()[:16]}.bin"
+        self.state.uploads[name] = content
+        self._send_json(200, {"file_url": self._media_url(name)})
+
+    def _handle_multipart_post(self, path: str, body: bytes) -> None:
+        if not self.state.config.multipart:
+            self._send_json(404, {"error": "multipart upload not supported"})
+            return
+        if not self._api_preamble("upload"):
+            return
+        if path.endswith("/initiate"):
+            upload_id = f"mp-{random.getrandbits(48):012x}"
+            self.state.multipart[upload_id] = {}
+            self._send_json(200, {"upload_id": upload_id})
+            return
+        match = re.match(r"^/api/fal/files/upload/multipart/([^/]+)/complete$", path)
+        upload = self.state.multipart.pop(match.group(1), None) if match else None
+        if upload is None:
+            self._send_json(404, {"error": "unknown upload"})
+            return
+        parts = json.loads(body).get("parts", [])
+        content = b"".join(upload[int(part["part_number"])] for part in parts)
+        name = f"{hashlib.sha256(content).hexdigest()[:16]}.bin"
+        self.state.uploads[name] = content
+        self._send_json(200, {"file_url": self._media_url(name)})
+
+    def _serve_status_stream(self, request_id: str) -> None:
+        config = self.state.config
+        if not config.sse:
+            self._send_json(404, {"error": "status stream not supported"})
+            return
+        self.state.count("status_stream")
+        job = self._job(request_id)
+        if job is None:
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        last = None
+        try:
+            while True:
+                status = job.status(config)
+                if status != last:
+                    self.wfile.write(f"data: {json.dumps(status)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    last = status
+                if status["status"] in {"COMPLETED", "CANCELLED"}:
+                    return
+                time.sleep(0.05)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def _serve_media(self) -> None:
+        self.state.count("media")
+        name = urlparse(self.path).path[len("/media/") :]
+        data = self.state.uploads.get(name)
+        size = len(data) if data is not None else self.state.config.media_bytes
+        start, end = 0, size - 1
+        range_match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        ranged = bool(range_match and self.state.config.media_ranges)
+        if ranged:
+            start = int(range_match.group(1))
+            end = min(int(range_match.group(2)) if range_match.group(2) else size - 1, size - 1)
+        self.send_response(206 if ranged else 200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(end - start + 1))
+        if self.state.config.media_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if ranged:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        try:
+            if data is not None:
+                self.wfile.write(data[start : end + 1])
+                return
+            block = b"\0" * (1024 * 1024)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = block[: min(remaining, len(block))]
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: StubConfig):
+        super().__init__(address, StubHandler)
+        self.state = StubState(config)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(config: StubConfig | None = None, *, host: str = "127.0.0.1", port: int = 0) -> StubServer:
+    """Start a stub server on a background thread; port=0 picks a free port."""
+    server = StubServer((host, port), config or StubConfig())
+    threading.Thread(target=server.serve_forever, name="fal-stub-server", daemon=True).start()
+    return server
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local stand-in FAL proxy server")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=8787, help="Bind port")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every API response")
+    parser.add_argument("--queue-seconds", type=float, default=2.0, help="Seconds a job stays IN_QUEUE")
+    parser.add_argument("--queue-depth", type=int, default=5, help="queue_position reported right after submit")
+    parser.add_argument("--run-seconds", type=float, default=3.0, help="Seconds a job stays IN_PROGRESS")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of API requests answered with 503")
+    parser.add_argument("--submit-error-rate", type=float, default=0.0, help="Share of submits answered with 503")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds on status responses")
+    parser.add_argument("--media-mb", type=float, default=4.0, help="Size of generated media in MB")
+    parser.add_argument("--no-ranges", action="store_true", help="Do not advertise byte ranges on media")
+    parser.add_argument("--no-sse", action="store_true", help="Disable the status event stream")
+    parser.add_argument("--no-multipart", action="store_true", help="Disable multipart upload endpoints")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = StubConfig(
+        latency=args.latency,
+        queue_seconds=args.queue_seconds,
+        queue_depth=args.queue_depth,
+        run_seconds=args.run_seconds,
+        error_rate=args.error_rate,
+        submit_error_rate=args.submit_error_rate,
+        retry_after=args.retry_after,
+        media_bytes=int(args.media_mb * 1024 * 1024),
+        media_ranges=not args.no_ranges,
+        sse=not args.no_sse,
+        multipart=not args.no_multipart,
+    )
+    server = StubServer((args.host, args.port), config)
+    print(f"[Stub] FAL proxy stub listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
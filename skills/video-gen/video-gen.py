@@ -16,12 +16,21 @@ Features:
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import contextlib
+import hashlib
+import json
 import os
 import pathlib
+import random
+import shutil
+import subprocess
 import sys
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
 
 
 CURRENT_DIR = pathlib.Path(__file__).resolve().parent
@@ -30,13 +39,32 @@ sys.path.insert(0, str(SHARED_DIR))
 
 from fal_client import (  # noqa: E402
     FalClientError,
+    FalJob,
+    FalJobPool,
+    PollSchedule,
+    ResultCache,
+    RouteStats,
+    RouteSummary,
+    _cache_dir,
+    canonical_json,
     download_to_file,
     fal_queue_result,
+    fal_cancel_pending,
+    fal_queue_cancel,
     fal_queue_submit,
     fal_queue_wait,
     fal_upload_file,
+    file_sha256,
+    get_default_client,
+    result_cache_scope,
 )
 
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - optional preprocessing
+    Image = None
+    ImageOps = None
+
 
 @dataclass
 class Route:
@@ -75,10 +103,10 @@ ROUTES = {
 }
 
 
-def parse_args() -> argparse.Namespace:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="AI Video Generator (FAL API Proxy)")
     parser.add_argument("--model", default="auto", help="Model alias: auto/veo-3.1/sora-2-pro/kling-v3-pro")
-    parser.add_argument("--prompt", required=True, help="Video prompt")
+    parser.add_argument("--prompt", default="", help="Video prompt (required unless --batch)")
     parser.add_argument("--size", default="720P", help="Resolution or WxH, e.g. 720P / 1280x720")
     parser.add_argument("--seconds", default="8", help="Duration in seconds (or with suffix, e.g. 8s)")
     parser.add_argument("--output-dir", default=".", help="Output directory")
@@ -90,9 +118,69 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--enhance-prompt", default="true", help="Enable prompt enhancement when supported")
     parser.add_argument("--negative-prompt", default="", help="Negative prompt (Kling)")
     parser.add_argument("--cfg-scale", type=float, default=None, help="CFG scale (Kling)")
-    parser.add_argument("--poll-interval", type=int, default=3, help="Queue polling interval seconds")
+    parser.add_argument(
+        "--optimize-images",
+        action="store_true",
+        help="Downscale local frame images to the target resolution and re-encode before upload (needs Pillow)",
+    )
+    parser.add_argument("--image-format", default="jpeg", choices=["jpeg", "webp"], help="Re-encode format")
+    parser.add_argument("--image-quality", type=int, default=92, help="Re-encode quality (1-100)")
+    parser.add_argument("--seed", type=int, default=None, help="Fixed seed for reproducible output (Veo)")
+    parser.add_argument(
+        "--cache-results",
+        action="store_true",
+        help="Reuse a locally cached result and video for an identical seeded request",
+    )
+    parser.add_argument("--refresh-cache", action="store_true", help="Ignore cached results but store the new one")
+    parser.add_argument("--poll-interval", type=int, default=3, help="Base queue polling interval seconds (adaptive)")
     parser.add_argument("--max-wait", type=int, default=20 * 60, help="Queue max wait seconds")
-    return parser.parse_args()
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reattach to a previously submitted job with the same payload instead of resubmitting",
+    )
+    parser.add_argument(
+        "--no-cancel",
+        action="store_true",
+        help="Leave submitted jobs running remotely on timeout, Ctrl-C or race loss (so --resume can reattach)",
+    )
+    parser.add_argument(
+        "--batch",
+        default="",
+        help="JSONL manifest; each line holds flag values (e.g. prompt, model, start_image) for one video",
+    )
+    parser.add_argument(
+        "--batch-output",
+        default="",
+        help="Results manifest (default: <output-dir>/<manifest>.results.jsonl)",
+    )
+    parser.add_argument(
+        "--storyboard",
+        default="",
+        help="JSONL of shots; shots in one branch are chained by handing each last frame to the next (needs ffmpeg)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Batch jobs (or storyboard branches) prepared and in flight at once",
+    )
+    parser.add_argument(
+        "--no-story-concat",
+        action="store_true",
+        help="Keep storyboard branches as separate videos instead of joining them into <name>.mp4",
+    )
+    parser.add_argument(
+        "--race",
+        default="",
+        help="Comma list of models (or 'all') to submit at once; keep the first finished video",
+    )
+    parser.add_argument("--fanout", default="", help="Comma list of models (or 'all') to submit at once; keep every video")
+    return parser
+
+
+def parse_args() -> argparse.Namespace:
+    return build_parser().parse_args()
 
 
 def as_bool(value: str | bool) -> bool:
@@ -141,6 +229,14 @@ def parse_size_to_aspect_and_resolution(size: str) -> tuple[str, str]:
     return "16:9", "720p"
 
 
+_RESOLUTION_BOX: dict[tuple[str, str], tuple[int, int]] = {
+    ("16:9", "720p"): (1280, 720),
+    ("9:16", "720p"): (720, 1280),
+    ("16:9", "1080p"): (1920, 1080),
+    ("9:16", "1080p"): (1080, 1920),
+}
+
+
 def parse_duration(seconds: str, model_path: str) -> str | int:
     raw = seconds.strip().lower()
     if not raw:
@@ -201,11 +297,147 @@ def resolve_route(model_key: str, has_start: bool, has_end: bool, frame_mode: st
     return ROUTES["veo_text"]
 
 
+AUTO_ROUTE_MODELS = ("veo", "sora", "kling_pro")
+AUTO_ROUTE_MIN_SAMPLES = 3
+# Share of auto runs sent to a candidate that is still short of samples, so it can start competing.
+AUTO_ROUTE_EXPLORE_RATE = 0.1
+
+
+def describe_route_summary(summary: RouteSummary) -> str:
+    if summary.samples < AUTO_ROUTE_MIN_SAMPLES:
+        return f"{summary.samples} recent samples (need {AUTO_ROUTE_MIN_SAMPLES})"
+    if summary.expected_seconds is None:
+        return f"all {summary.samples} recent jobs failed"
+
+    def seconds(value: float | None) -> str:
+        return "?" if value is None else f"{value:.0f}s"
+
+    return (
+        f"expected {summary.expected_seconds:.0f}s (queue {seconds(summary.queue_seconds)}, "
+        f"run {seconds(summary.run_seconds)}, {summary.failure_rate:.0%} failed, n={summary.samples})"
+    )
+
+
+def choose_auto_route(
+    has_start: bool,
+    has_end: bool,
+    frame_mode: str,
+    fast_first_last: bool,
+    stats: RouteStats | None,
+) -> tuple[Route, list[str]]:
+    """`--model auto`: the route with the best expected completion time for these inputs.
+
+    Candidates are the routes each high-quality model would use for the same
+    inputs. While any candidate is short of recent samples, AUTO_ROUTE_EXPLORE_RATE
+    of runs go to the one with the fewest, since only auto runs would otherwise
+    ever sample it. The static default wins until it has enough recent samples
+    to be compared; after that only routes with enough samples and at least one
+    recent success are considered, so a default whose recent jobs all failed
+    loses to any of them. Returns the route plus the decision lines to print.
+    """
+    default = resolve_route("auto", has_start, has_end, frame_mode, fast_first_last)
+    if stats is None:
+        return default, [f"[Route] auto -> {default.model_path} (route stats disabled)"]
+
+    candidates = [default]
+    for model_key in AUTO_ROUTE_MODELS:
+        route = resolve_route(model_key, has_start, has_end, frame_mode, fast_first_last)
+        if all(route.model_path != seen.model_path for seen in candidates):
+            candidates.append(route)
+    summaries = {route.model_path: stats.summary(route.model_path) for route in candidates}
+    lines = [f"[Route]   {path}: {describe_route_summary(summary)}" for path, summary in summaries.items()]
+
+    def usable(route: Route) -> bool:
+        summary = summaries[route.model_path]
+        return summary.samples >= AUTO_ROUTE_MIN_SAMPLES and summary.expected_seconds is not None
+
+    under_sampled = [route for route in candidates if summaries[route.model_path].samples < AUTO_ROUTE_MIN_SAMPLES]
+    if under_sampled and random.random() < AUTO_ROUTE_EXPLORE_RATE:
+        pick = min(under_sampled, key=lambda route: summaries[route.model_path].samples)
+        samples = summaries[pick.model_path].samples
+        reason = f"exploring; {samples} recent samples, need {AUTO_ROUTE_MIN_SAMPLES}"
+        return pick, [f"[Route] auto -> {pick.model_path} ({reason})", *lines]
+    if summaries[default.model_path].samples < AUTO_ROUTE_MIN_SAMPLES:
+        return default, [f"[Route] auto -> {default.model_path} (default; not enough recent stats)", *lines]
+    usable_routes = [route for route in candidates if usable(route)]
+    if not usable_routes:
+        return default, [f"[Route] auto -> {default.model_path} (default; no route has recent successes)", *lines]
+    best = min(usable_routes, key=lambda route: summaries[route.model_path].expected_seconds or 0.0)
+    if best is default:
+        reason = "default"
+    elif not usable(default):
+        reason = f"default {default.model_path} failed all recent jobs"
+    else:
+        reason = f"faster than default {default.model_path}"
+    return best, [
+        f"[Route] auto -> {best.model_path} ({reason}; expected {summaries[best.model_path].expected_seconds:.0f}s)",
+        *lines,
+    ]
+
+
 def is_remote_url(value: str) -> bool:
     return value.startswith("http://") or value.startswith("https://")
 
 
-def resolve_image_source(path_or_url: str) -> str:
+def optimize_image(
+    local_path: pathlib.Path,
+    aspect_ratio: str,
+    resolution: str,
+    *,
+    image_format: str = "jpeg",
+    quality: int = 92,
+) -> pathlib.Path:
+    # Cached by source hash and settings, so repeat runs also hit the upload cache.
+    if Image is None:
+        raise RuntimeError("Pillow not found; it is required for --optimize-images (run with `uv run --with pillow`)")
+
+    target_w, target_h = _RESOLUTION_BOX.get((aspect_ratio, resolution), (1280, 720))
+    upload_cache = get_default_client().upload_cache
+    key = upload_cache.content_hash(local_path) if upload_cache is not None else file_sha256(local_path)
+    suffix = ".jpg" if image_format == "jpeg" else ".webp"
+    cache_dir = _cache_dir() / "images"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    output = cache_dir / f"{key[:32]}-{target_w}x{target_h}-q{quality}{suffix}"
+    source_size = local_path.stat().st_size
+    mb = 1024 * 1024
+
+    if not output.exists():
+        with Image.open(local_path) as opened:
+            image = ImageOps.exif_transpose(opened)
+            width, height = image.size
+            # Cover the target frame; the model crops to aspect, so never go below either edge.
+            scale = max(target_w / width, target_h / height)
+            if scale < 1:
+                image = image.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+            has_alpha = image.mode in {"RGBA", "LA"} or (image.mode == "P" and "transparency" in image.info)
+            if image_format == "jpeg" or not has_alpha:
+                image = image.convert("RGB")
+            # Unique per writer: start and end frame (or batch lines) may share a source and run in parallel.
+            with tempfile.NamedTemporaryFile(dir=cache_dir, prefix=output.name, suffix=".tmp", delete=False) as handle:
+                tmp = pathlib.Path(handle.name)
+                # No exif/icc_profile arguments: metadata is dropped.
+                image.save(handle, format=image_format.upper(), quality=quality, optimize=True)
+            if output.exists():
+                tmp.unlink(missing_ok=True)  # Another writer got there first with the same bytes.
+            else:
+                os.replace(tmp, output)
+        cached = ""
+    else:
+        cached = ", cached"
+
+    optimized_size = output.stat().st_size
+    if optimized_size >= source_size:
+        print(f"[Image] {local_path.name}: original is smaller ({source_size / mb:.2f} MB), uploading as-is")
+        return local_path
+    saved = source_size - optimized_size
+    print(
+        f"[Image] {local_path.name}: {source_size / mb:.2f} MB -> {optimized_size / mb:.2f} MB "
+        f"{image_format.upper()} (saved {saved / mb:.2f} MB, {saved * 100 // source_size}%{cached})"
+    )
+    return output
+
+
+def resolve_image_source(path_or_url: str, optimize: dict[str, Any] | None = None) -> str:
     if not path_or_url:
         return ""
     if is_remote_url(path_or_url):
@@ -214,8 +446,37 @@ def resolve_image_source(path_or_url: str) -> str:
     local_path = pathlib.Path(path_or_url).expanduser().resolve()
     if not local_path.exists():
         raise FileNotFoundError(f"Image not found: {local_path}")
+    upload_path = optimize_image(local_path, **optimize) if optimize else local_path
 
-    return fal_upload_file(str(local_path))
+    def on_progress(sent: int, total: int, bytes_per_second: float) -> None:
+        mb = 1024 * 1024
+        print(f"[Upload] {local_path.name}: {sent / mb:.1f}/{total / mb:.1f} MB ({bytes_per_second / mb:.1f} MB/s)")
+
+    return fal_upload_file(str(upload_path), on_progress=on_progress)
+
+
+def prepare_inputs(inputs: dict[str, str], optimize: dict[str, Any] | None) -> dict[str, tuple[str, str, float]]:
+    """Validate, optimize and upload all media inputs concurrently.
+
+    Returns {label: (source, url, seconds)} for the non-empty inputs; the first
+    failure is raised once every input has finished.
+    """
+
+    def prepare(source: str) -> tuple[str, str, float]:
+        started = time.monotonic()
+        url = resolve_image_source(source, optimize)
+        return source, url, time.monotonic() - started
+
+    active = {label: source for label, source in inputs.items() if source}
+    for source in active.values():
+        # Cheap checks first, so a typo in one path does not cost another input's upload.
+        if not is_remote_url(source) and not pathlib.Path(source).expanduser().exists():
+            raise FileNotFoundError(f"Image not found: {pathlib.Path(source).expanduser().resolve()}")
+    if len(active) <= 1:
+        return {label: prepare(source) for label, source in active.items()}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(active)) as pool:
+        futures = {label: pool.submit(prepare, source) for label, source in active.items()}
+    return {label: future.result() for label, future in futures.items()}
 
 
 def build_payload(
@@ -231,6 +492,7 @@ def build_payload(
     enhance_prompt: bool,
     negative_prompt: str,
     cfg_scale: float | None,
+    seed: int | None = None,
 ) -> dict[str, Any]:
     payload: dict[str, Any] = {
         "prompt": prompt,
@@ -242,6 +504,8 @@ def build_payload(
         payload["resolution"] = resolution
         payload["generate_audio"] = generate_audio
         payload["enhance_prompt"] = enhance_prompt
+        if seed is not None:
+            payload["seed"] = seed
     elif "kling-video" in route.model_path and cfg_scale is not None:
         payload["cfg_scale"] = cfg_scale
 
@@ -289,8 +553,65 @@ def find_video_url(data: Any) -> str | None:
     return None
 
 
-def main() -> None:
-    args = parse_args()
+QUEUE_LOG_INTERVAL_SECONDS = 10
+
+
+def describe_eta(status_payload: dict[str, Any]) -> str:
+    eta = status_payload.get("eta") or {}
+    parts = []
+    if eta.get("queue_position") is not None and status_payload.get("status") == "IN_QUEUE":
+        parts.append(f"position {eta['queue_position']}")
+        if eta.get("positions_per_minute"):
+            parts.append(f"{eta['positions_per_minute']:.1f}/min")
+    if eta.get("progress") is not None and status_payload.get("status") == "IN_PROGRESS":
+        parts.append(f"{eta['progress']:.0%}")
+    if eta.get("eta_seconds") is not None:
+        parts.append(f"~{eta['eta_seconds']:.0f}s left")
+    return ", ".join(parts)
+
+
+def describe_poll(status_payload: dict[str, Any]) -> str:
+    poll = status_payload.get("poll", {})
+    if poll.get("stream_events") and not poll.get("calls"):
+        described = "streaming"
+    else:
+        described = f"{poll.get('calls', 0)} polls"
+    eta = describe_eta(status_payload)
+    return f"{described}, {eta}" if eta else described
+
+
+@dataclass
+class JobPlan:
+    route: Route
+    payload: dict[str, Any]
+    prepare_seconds: float
+    route_decision: str = ""  # Why --model auto picked the route, e.g. "auto -> ... (default; ...)".
+
+
+def optimize_options(args: argparse.Namespace, aspect_ratio: str, resolution: str) -> dict[str, Any] | None:
+    if not args.optimize_images:
+        return None
+    if Image is None:
+        raise RuntimeError("Pillow not found; it is required for --optimize-images (run with `uv run --with pillow`)")
+    return {
+        "aspect_ratio": aspect_ratio,
+        "resolution": resolution,
+        "image_format": args.image_format,
+        "quality": max(1, min(100, args.image_quality)),
+    }
+
+
+def plan_job(
+    args: argparse.Namespace,
+    *,
+    verbose: bool = True,
+    prepared: dict[str, tuple[str, str, float]] | None = None,
+) -> JobPlan:
+    """Resolve route and sizes, prepare media inputs and build the payload for one job.
+
+    Pass `prepared` (from prepare_inputs) to reuse inputs already uploaded for another route.
+    """
+    started = time.monotonic()
     frame_mode = normalize_frame_mode(args.frame_mode)
     model_key = resolve_model_key(args.model)
 
@@ -299,33 +620,44 @@ def main() -> None:
     has_start = bool(start_image_input)
     has_end = bool(end_image_input)
 
-    route = resolve_route(
-        model_key,
-        has_start=has_start,
-        has_end=has_end,
-        frame_mode=frame_mode,
-        fast_first_last=args.fast_first_last,
-    )
+    route_decision: list[str] = []
+    if model_key == "auto":
+        route, route_decision = choose_auto_route(
+            has_start, has_end, frame_mode, args.fast_first_last, get_default_client().route_stats
+        )
+    else:
+        route = resolve_route(
+            model_key,
+            has_start=has_start,
+            has_end=has_end,
+            frame_mode=frame_mode,
+            fast_first_last=args.fast_first_last,
+        )
 
     aspect_ratio, resolution = parse_size_to_aspect_and_resolution(args.size)
     duration = parse_duration(args.seconds, route.model_path)
 
-    print("[VideoGen] Starting video generation...")
-    print(f"[Config] Route: {route.model_path}")
-    print(f"[Config] Prompt: {args.prompt}")
-    print(f"[Config] Aspect ratio: {aspect_ratio}")
-    print(f"[Config] Resolution: {resolution}")
-    print(f"[Config] Duration: {duration}")
-    if start_image_input:
-        print(f"[Config] Start image: {start_image_input}")
-    if end_image_input:
-        print(f"[Config] End image: {end_image_input}")
+    if verbose:
+        print("[VideoGen] Starting video generation...")
+        for line in route_decision:
+            print(line)
+        print(f"[Config] Route: {route.model_path}")
+        print(f"[Config] Prompt: {args.prompt}")
+        print(f"[Config] Aspect ratio: {aspect_ratio}")
+        print(f"[Config] Resolution: {resolution}")
+        print(f"[Config] Duration: {duration}")
 
     if not os.environ.get("MAX_API_KEY"):
         raise FalClientError("Missing MAX_API_KEY environment variable")
 
-    start_image_url = resolve_image_source(start_image_input) if start_image_input else ""
-    end_image_url = resolve_image_source(end_image_input) if end_image_input else ""
+    if prepared is None:
+        optimize = optimize_options(args, aspect_ratio, resolution)
+        prepared = prepare_inputs({"Start image": start_image_input, "End image": end_image_input}, optimize)
+    if verbose:
+        for label, (source, _url, seconds) in prepared.items():
+            print(f"[Config] {label}: {source} (ready in {seconds:.2f}s)")
+    start_image_url = prepared["Start image"][1] if "Start image" in prepared else ""
+    end_image_url = prepared["End image"][1] if "End image" in prepared else ""
 
     payload = build_payload(
         route,
@@ -339,32 +671,642 @@ def main() -> None:
         enhance_prompt=as_bool(args.enhance_prompt),
         negative_prompt=args.negative_prompt,
         cfg_scale=args.cfg_scale,
+        seed=args.seed,
     )
+    decision = route_decision[0].removeprefix("[Route] ") if route_decision else ""
+    return JobPlan(route, payload, time.monotonic() - started, decision)
+
+
+def attach_result_cache(args: argparse.Namespace) -> None:
+    """CLI runs own their process, so they enable caching on the default client; see generate_video."""
+    client = get_default_client()
+    if (args.cache_results or args.refresh_cache) and client.result_cache is None:
+        client.result_cache = ResultCache()
+
+
+# Keys a manifest line may not override: they control the batch run itself.
+BATCH_ONLY_KEYS = {
+    "batch",
+    "batch_output",
+    "concurrency",
+    "storyboard",
+    "no_story_concat",
+    "race",
+    "fanout",
+    "no_cancel",
+}
+
+
+def batch_line_args(args: argparse.Namespace, line: dict[str, Any], base_dir: pathlib.Path) -> argparse.Namespace:
+    """CLI defaults overlaid with one manifest line (keys are flag names, '-' or '_').
+
+    Relative image paths are taken relative to the manifest's directory.
+    """
+    values = vars(args).copy()
+    for key, value in line.items():
+        name = key.replace("-", "_")
+        if name == "id":
+            continue
+        if name not in values or name in BATCH_ONLY_KEYS:
+            raise ValueError(f"Unknown manifest field: {key}")
+        if isinstance(values[name], str) and isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)  # e.g. "seconds": 5
+        if name in {"start_image", "end_image"} and value and not is_remote_url(value):
+            value = str(base_dir / pathlib.Path(value).expanduser())
+        values[name] = value
+    if not values.get("prompt"):
+        raise ValueError("Manifest line is missing prompt")
+    return argparse.Namespace(**values)
+
+
+def batch_line_key(line: dict[str, Any]) -> str:
+    if line.get("id") not in (None, ""):
+        return str(line["id"])
+    return hashlib.sha256(canonical_json(line).encode("utf-8")).hexdigest()[:16]
+
+
+def load_batch_done(output_path: pathlib.Path) -> set[str]:
+    """Keys of lines that already produced a video still on disk."""
+    done: set[str] = set()
+    if not output_path.exists():
+        return done
+    for raw in output_path.read_text(encoding="utf-8").splitlines():
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            continue  # Torn last line from an interrupted run.
+        output = entry.get("output_path")
+        if entry.get("status") == "COMPLETED" and output and pathlib.Path(output).exists():
+            done.add(str(entry.get("key")))
+    return done
+
+
+def run_batch(args: argparse.Namespace) -> None:
+    manifest_path = pathlib.Path(args.batch).expanduser().resolve()
+    output_dir = pathlib.Path(args.output_dir).expanduser().resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if args.batch_output:
+        results_path = pathlib.Path(args.batch_output).expanduser().resolve()
+    else:
+        results_path = output_dir / f"{manifest_path.stem}.results.jsonl"
+
+    lines: list[tuple[int, dict[str, Any]]] = []
+    for number, raw in enumerate(manifest_path.read_text(encoding="utf-8").splitlines(), start=1):
+        if raw.strip() and not raw.lstrip().startswith("#"):
+            lines.append((number, json.loads(raw)))
+    done = load_batch_done(results_path)
+    pending = [(number, line) for number, line in lines if batch_line_key(line) not in done]
+    print(f"[Batch] {len(lines)} jobs in {manifest_path.name}, {len(lines) - len(pending)} already done")
+    print(f"[Batch] Results: {results_path}")
+    if not pending:
+        return
+
+    attach_result_cache(args)
+    retried = fal_cancel_pending()
+    if retried:
+        print(f"[Cancel] Cancelled {retried} job(s) left running by an earlier interrupted run")
+    concurrency = max(1, args.concurrency)
+    write_lock = threading.Lock()
+    failures = 0
+
+    def record(entry: dict[str, Any]) -> None:
+        nonlocal failures
+        with write_lock:
+            failures += entry["status"] != "COMPLETED"
+            with results_path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry) + "\n")
+            detail = entry.get("output_path") or entry.get("error")
+            print(f"[Batch] #{entry['line']} {entry['status']}: {detail}")
+
+    def prepare(number: int, line: dict[str, Any]) -> tuple[int, dict[str, Any], JobPlan]:
+        return number, line, plan_job(batch_line_args(args, line, manifest_path.parent), verbose=False)
+
+    def download(number: int, line: dict[str, Any], plan: JobPlan, job: FalJob) -> None:
+        entry: dict[str, Any] = {
+            "line": number,
+            "key": batch_line_key(line),
+            "route": plan.route.model_path,
+            "request_id": job.request_id,
+        }
+        timings = {"prepare": round(plan.prepare_seconds, 3)}
+        if job.submitted_at is not None and job.completed_at is not None:
+            timings["queue"] = round(job.completed_at - job.submitted_at, 3)
+        try:
+            video_url = find_video_url(job.result())
+            if not video_url:
+                raise FalClientError(f"No video URL found in queue result: {job.result()}")
+            started = time.monotonic()
+            output_path = output_dir / f"{manifest_path.stem}_{number:03d}_{int(time.time() * 1000)}.mp4"
+            download_to_file(video_url, str(output_path))
+            timings["download"] = round(time.monotonic() - started, 3)
+            journal = get_default_client().journal
+            if journal is not None:
+                journal.update(job.request_id, result_url=video_url, output_path=str(output_path))
+            entry.update(status="COMPLETED", output_path=str(output_path), video_url=video_url)
+        except concurrent.futures.CancelledError:
+            entry.update(status="FAILED", error="cancelled before submit")
+        except Exception as error:  # pylint: disable=broad-except
+            entry.update(status="FAILED", error=str(error))
+        timings["total"] = round(sum(timings.values()), 3)
+        record({**entry, "timings": timings})
+
+    schedule = PollSchedule(queued_interval=max(1, args.poll_interval))
+    # The pool exits first, so on Ctrl-C its unfinished jobs are cancelled and recorded as failed lines.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as workers, FalJobPool(
+        max_in_flight=concurrency,
+        per_model_limit=concurrency,
+        poll_schedule=schedule,
+        max_wait_seconds=args.max_wait,
+        resume=args.resume,
+        cancel_abandoned=not args.no_cancel,
+    ) as pool:
+        downloads: list[concurrent.futures.Future] = []
+
+        def on_done(number: int, line: dict[str, Any], plan: JobPlan, job: FalJob) -> None:
+            downloads.append(workers.submit(download, number, line, plan, job))
+
+        preparing = {workers.submit(prepare, number, line): (number, line) for number, line in pending}
+        # Each line is queued as soon as its own inputs are uploaded.
+        for future in concurrent.futures.as_completed(preparing):
+            try:
+                number, line, plan = future.result()
+            except Exception as error:  # pylint: disable=broad-except
+                number, line = preparing[future]
+                record({"line": number, "key": batch_line_key(line), "status": "FAILED", "error": str(error)})
+                continue
+            if plan.route_decision:
+                with write_lock:
+                    print(f"[Batch] #{number} {plan.route_decision}")
+            job = pool.submit(plan.route.model_path, plan.payload)
+            job.future.add_done_callback(
+                lambda _f, n=number, batch_line=line, p=plan, j=job: on_done(n, batch_line, p, j)
+            )
+        # Job futures resolve (and queue their downloads) on the pool thread before shutdown returns.
+        pool.shutdown(wait=True)
+        concurrent.futures.wait(downloads)
+
+    print(f"[Batch] Finished: {len(pending) - failures} succeeded, {failures} failed")
+    if failures:
+        raise FalClientError(f"{failures} batch job(s) failed; rerun the same command to retry them")
+
+
+MULTI_MODEL_ALL = ("veo", "sora", "kling_pro")
+
+
+def run_multi(args: argparse.Namespace, models: str, *, race: bool) -> None:
+    """Submit one prompt to several routes: keep the first finisher (race) or all (fanout)."""
+    keys = MULTI_MODEL_ALL if models.strip().lower() == "all" else [resolve_model_key(m) for m in models.split(",") if m.strip()]
+    if not os.environ.get("MAX_API_KEY"):
+        raise FalClientError("Missing MAX_API_KEY environment variable")
+
+    aspect_ratio, resolution = parse_size_to_aspect_and_resolution(args.size)
+    started = time.monotonic()
+    prepared = prepare_inputs(
+        {"Start image": args.start_image, "End image": args.end_image},
+        optimize_options(args, aspect_ratio, resolution),
+    )
+    prepare_seconds = time.monotonic() - started
+    plans: dict[str, JobPlan] = {}
+    for key in keys:
+        plan = plan_job(argparse.Namespace(**{**vars(args), "model": key}), verbose=False, prepared=prepared)
+        plan.prepare_seconds = prepare_seconds
+        plans.setdefault(plan.route.model_path, plan)  # Several aliases can resolve to one route.
+    if len(plans) < 2:
+        raise ValueError(f"--{'race' if race else 'fanout'} needs at least two distinct routes, got {list(plans)}")
+
+    label = "Race" if race else "Fanout"
+    print(f"[{label}] Prompt: {args.prompt}")
+    print(f"[{label}] Routes: {', '.join(plans)}")
+    attach_result_cache(args)
+    output_dir = pathlib.Path(args.output_dir).expanduser().resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = int(time.time() * 1000)
+
+    def on_status(job: FalJob, status: str, payload: Any) -> None:
+        eta = describe_eta(payload) if isinstance(payload, dict) else ""
+        print(f"[{label}] {job.model_path}: {status}" + (f" ({eta})" if eta else ""))
+
+    latencies: dict[str, dict[str, Any]] = {}
+    saved: list[pathlib.Path] = []
+    # Exiting the pool on an error or Ctrl-C cancels whatever is still running.
+    with FalJobPool(
+        max_in_flight=len(plans),
+        per_model_limit=1,
+        poll_schedule=PollSchedule(queued_interval=max(1, args.poll_interval)),
+        max_wait_seconds=args.max_wait,
+        resume=args.resume,
+        on_status=on_status,
+        cancel_abandoned=not args.no_cancel,
+    ) as pool:
+        jobs = [pool.submit(path, plan.payload) for path, plan in plans.items()]
+        for job in pool.as_completed(jobs):
+            seconds = round((job.completed_at or time.time()) - (job.submitted_at or time.time()), 3)
+            latencies[job.model_path] = {"request_id": job.request_id, "status": job.status, "seconds": seconds}
+            try:
+                video_url = find_video_url(job.result())
+            except Exception as error:  # pylint: disable=broad-except
+                print(f"[{label}] {job.model_path}: failed after {seconds}s ({error})")
+                continue
+            if not video_url:
+                print(f"[{label}] {job.model_path}: no video URL in result")
+                continue
+            if race:
+                latencies[job.model_path]["winner"] = True
+                # Stop the losers before spending the download time on the winner.
+                for other in jobs:
+                    if other is job or other.model_path in latencies:
+                        continue
+                    if not other.done():
+                        # With --no-cancel losers keep running and stay resumable with --resume.
+                        pool.abandon(other)
+                    latencies[other.model_path] = {"request_id": other.request_id, "status": other.status}
+            slug = job.model_path.replace("fal-ai/", "").replace("/", "-")
+            output_path = output_dir / f"generated_video_{timestamp}_{slug}.mp4"
+            download_to_file(video_url, str(output_path))
+            journal = get_default_client().journal
+            if journal is not None:
+                journal.update(job.request_id, result_url=video_url, output_path=str(output_path))
+            saved.append(output_path)
+            print(f"[{label}] {job.model_path}: finished in {seconds}s -> {output_path}")
+            if race:
+                break
+
+    for path, entry in latencies.items():
+        print(f"[{label}] Latency {path}: {json.dumps(entry)}")
+    if not saved:
+        raise FalClientError(f"All {len(plans)} routes failed")
+    for output_path in saved:
+        print(f"[Done] Video saved: {output_path}")
+
+
+@dataclass(eq=False)
+class VideoJob:
+    """Handle for a video started with generate_video(); also tracks CLI runs."""
+
+    prompt: str
+    future: concurrent.futures.Future = field(default_factory=concurrent.futures.Future, repr=False)
+    route: str = ""
+    request_id: str = ""
+    status: str = "PENDING"
+    output_path: pathlib.Path | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+    on_status: Callable[[VideoJob, str, Any], None] | None = field(default=None, repr=False)
+
+    def result(self, timeout: float | None = None) -> pathlib.Path:
+        return self.future.result(timeout)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def set_status(self, status: str, detail: Any = None) -> None:
+        # Repeats of a queue status carry a fresh ETA; anything else only fires on change.
+        if status == self.status and not (isinstance(detail, dict) and "eta" in detail):
+            return
+        self.status = status
+        if self.on_status is not None:
+            try:
+                self.on_status(self, status, detail)
+            except Exception:  # pylint: disable=broad-except
+                pass  # A failing callback must not fail the job or strand its queue request.
+
+
+_video_executor: concurrent.futures.ThreadPoolExecutor | None = None
+_video_executor_lock = threading.Lock()
+
+
+def _default_video_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _video_executor
+    with _video_executor_lock:
+        if _video_executor is None:
+            _video_executor = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="video-gen")
+        return _video_executor
+
+
+def video_args(*, no_cancel: bool = False, **options: Any) -> argparse.Namespace:
+    """CLI defaults overlaid with keyword options named like the flags (e.g. start_image)."""
+    args = batch_line_args(build_parser().parse_args([]), options, pathlib.Path.cwd())
+    # Unlike a manifest line, a single library job may opt out of cancel-on-timeout.
+    args.no_cancel = bool(no_cancel)
+    return args
+
+
+def generate_video(
+    prompt: str,
+    *,
+    on_status: Callable[[VideoJob, str, Any], None] | None = None,
+    log: Callable[[str], None] | None = None,
+    executor: concurrent.futures.Executor | None = None,
+    **options: Any,
+) -> VideoJob:
+    """Start generating one video in the background and return its handle.
+
+    `options` take the CLI flag names (model, size, seconds, output_dir,
+    start_image, end_image, seed, resume, no_cancel, ...). All jobs in the process share
+    the default FalClient and its connection pool. on_status(job, status,
+    detail) fires for PREPARING, queue statuses (again whenever detail["eta"]
+    moves), DOWNLOADING, DONE and FAILED; job.result() returns the saved path
+    or raises the failure.
+    """
+    args = video_args(prompt=prompt, **options)
+    if not os.environ.get("MAX_API_KEY"):
+        raise FalClientError("Missing MAX_API_KEY environment variable")
+    job = VideoJob(prompt, on_status=on_status)
+
+    def run() -> None:
+        if not job.future.set_running_or_notify_cancel():
+            return
+        started = time.monotonic()
+        try:
+            job.set_status("PREPARING")
+            plan = plan_job(args, verbose=False)
+            job.timings["prepare"] = round(plan.prepare_seconds, 3)
+            if plan.route_decision and log is not None:
+                log(plan.route_decision)
+            output_dir = pathlib.Path(args.output_dir).expanduser().resolve()
+            output_path = output_dir / f"generated_video_{int(time.time() * 1000)}_{id(job):x}.mp4"
+            # Scoped to this job: other callers in the host process keep uncached results.
+            with result_cache_scope(args.cache_results or args.refresh_cache):
+                saved = execute_plan(plan, args, output_path, log=log or (lambda _message: None), job=job)
+        except Exception as error:  # pylint: disable=broad-except
+            job.timings["total"] = round(time.monotonic() - started, 3)
+            job.future.set_exception(error)
+            job.set_status("FAILED", error)
+            return
+        job.timings["total"] = round(time.monotonic() - started, 3)
+        job.future.set_result(saved)
+        job.set_status("DONE", saved)
+
+    (executor or _default_video_executor()).submit(run)
+    return job
+
+
+_active_requests: dict[str, str] = {}
+_active_requests_lock = threading.Lock()
+# Set on Ctrl-C so worker threads (e.g. storyboard branches) stop submitting new shots.
+_interrupted = threading.Event()
+
+
+@contextlib.contextmanager
+def active_request(model_path: str, request_id: str) -> Iterator[None]:
+    """Mark a request as being waited on, so an interrupted run can cancel it."""
+    with _active_requests_lock:
+        _active_requests[request_id] = model_path
+    interrupted = False
+    try:
+        yield
+    except KeyboardInterrupt:
+        interrupted = True  # Stays registered for cancel_active_requests.
+        raise
+    finally:
+        if not interrupted:
+            with _active_requests_lock:
+                _active_requests.pop(request_id, None)
+
+
+def cancel_active_requests(log: Callable[[str], None] = print) -> None:
+    """Best-effort cancel of every request still being waited on (e.g. after Ctrl-C)."""
+    with _active_requests_lock:
+        active = list(_active_requests.items())
+    for request_id, model_path in active:
+        try:
+            outcome = fal_queue_cancel(model_path, request_id)
+            log(f"[Cancel] {request_id}: {outcome.get('status') if isinstance(outcome, dict) else outcome}")
+        except FalClientError as error:
+            log(f"[Cancel] Could not cancel {request_id} ({error}); it will be retried on the next run")
+
 
-    created = fal_queue_submit(route.model_path, payload)
+def execute_plan(
+    plan: JobPlan,
+    args: argparse.Namespace,
+    output_path: pathlib.Path,
+    *,
+    log: Callable[[str], None] = print,
+    job: VideoJob | None = None,
+) -> pathlib.Path:
+    """Submit (or resume / reuse) one planned job, wait for it and download the video.
+
+    Returns the saved video path, which is an earlier output when a resumed
+    job had already been downloaded. `job`, when given, receives request_id,
+    status changes and per-stage timings as they happen.
+    """
+    route, payload = plan.route, plan.payload
+    journal = get_default_client().journal
+    tracker = job or VideoJob(str(payload.get("prompt", "")))
+    tracker.route = route.model_path
+    if _interrupted.is_set():
+        raise FalClientError("Interrupted before submit")
+    started = time.monotonic()
+    created = fal_queue_submit(route.model_path, payload, resume=args.resume, bypass_cache=args.refresh_cache)
     request_id = created.get("request_id")
     if not request_id:
         raise FalClientError(f"Queue submit missing request_id: {created}")
-    print(f"[Queue] Request submitted: {request_id}")
+    tracker.request_id = str(request_id)
+    tracker.timings["submit"] = round(time.monotonic() - started, 3)
+    tracker.set_status(str(created.get("status") or "SUBMITTED"), created)
+    if created.get("cached"):
+        log("[Cache] Reusing cached result for identical request")
+    elif created.get("resumed"):
+        log(f"[Resume] Reattaching to request {request_id} ({created.get('status')})")
+        existing_output = created.get("output_path")
+        if created.get("status") == "COMPLETED" and existing_output and pathlib.Path(existing_output).exists():
+            log(f"[Done] Video already generated: {existing_output}")
+            tracker.output_path = pathlib.Path(existing_output)
+            return tracker.output_path
+    else:
+        log(f"[Queue] Request submitted: {request_id}")
 
-    print("[Queue] Waiting for completion...")
-    fal_queue_wait(
-        route.model_path,
-        request_id,
-        poll_interval_seconds=max(1, args.poll_interval),
-        max_wait_seconds=args.max_wait,
-        on_status=lambda status, _payload, elapsed: print(f"[Queue] {status} ({elapsed}s)"),
-    )
+    log("[Queue] Waiting for completion...")
+
+    last_logged = {"status": "", "at": 0.0}
+
+    def on_status(status: str, status_payload: Any, elapsed: int) -> None:
+        # Position/progress updates can arrive every poll; log them at most every few seconds.
+        now = time.monotonic()
+        if status != last_logged["status"] or now - last_logged["at"] >= QUEUE_LOG_INTERVAL_SECONDS:
+            log(f"[Queue] {status} ({elapsed}s, {describe_poll(status_payload)})")
+            last_logged.update(status=status, at=now)
+        tracker.set_status(status, status_payload)
+
+    wait_options: dict[str, Any] = {
+        "poll_interval_seconds": max(1, args.poll_interval),
+        "max_wait_seconds": args.max_wait,
+        "on_status": on_status,
+        "cancel_on_timeout": not args.no_cancel,
+    }
+    queued_at = time.monotonic()
+    try:
+        with active_request(route.model_path, request_id):
+            fal_queue_wait(route.model_path, request_id, **wait_options)
+    except FalClientError as error:
+        if not created.get("resumed") or error.status_code != 404:
+            raise
+        # The proxy no longer knows the journalled request; pay for a fresh one.
+        if journal is not None:
+            journal.update(request_id, status="EXPIRED")
+        created = fal_queue_submit(route.model_path, payload)
+        request_id = created.get("request_id")
+        if not request_id:
+            raise FalClientError(f"Queue submit missing request_id: {created}") from error
+        tracker.request_id = str(request_id)
+        log(f"[Queue] Resumed request expired, resubmitted: {request_id}")
+        with active_request(route.model_path, request_id):
+            fal_queue_wait(route.model_path, request_id, **wait_options)
+    tracker.timings["queue"] = round(time.monotonic() - queued_at, 3)
     result = fal_queue_result(route.model_path, request_id)
     video_url = find_video_url(result)
     if not video_url:
         raise FalClientError(f"No video URL found in queue result: {result}")
 
-    timestamp = int(time.time() * 1000)
+    tracker.set_status("DOWNLOADING", {"video_url": video_url})
+    started = time.monotonic()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    download_to_file(video_url, str(output_path))
+    tracker.timings["download"] = round(time.monotonic() - started, 3)
+    if journal is not None:
+        journal.update(request_id, result_url=video_url, output_path=str(output_path))
+    tracker.output_path = output_path
+    return output_path
+
+
+def extract_last_frame(video_path: pathlib.Path, frame_path: pathlib.Path) -> pathlib.Path:
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg not found on PATH; it is required for --storyboard")
+    # Seek near the end and keep overwriting one image, so the file ends up holding the last frame.
+    command = [ffmpeg, "-v", "error", "-y", "-sseof", "-1", "-i", str(video_path), "-update", "1", str(frame_path)]
+    completed = subprocess.run(command, capture_output=True, text=True, check=False)
+    if completed.returncode != 0 or not frame_path.exists():
+        raise RuntimeError(f"ffmpeg could not extract the last frame of {video_path}: {completed.stderr.strip()}")
+    return frame_path
+
+
+def concat_videos(videos: list[pathlib.Path], output_path: pathlib.Path) -> pathlib.Path:
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg not found on PATH; it is required for --storyboard")
+    list_path = output_path.with_suffix(".txt")
+    quoted = [str(video).replace("'", "'\\''") for video in videos]  # concat demuxer quoting
+    list_path.write_text("".join(f"file '{path}'\n" for path in quoted), encoding="utf-8")
+    base = [ffmpeg, "-v", "error", "-y", "-f", "concat", "-safe", "0", "-i", str(list_path)]
+    try:
+        completed = subprocess.run([*base, "-c", "copy", str(output_path)], capture_output=True, text=True, check=False)
+        if completed.returncode != 0:
+            # Shots from different routes may not share codec parameters; re-encode instead.
+            reencode = [*base, "-c:v", "libx264", "-crf", "18", "-c:a", "aac", str(output_path)]
+            completed = subprocess.run(reencode, capture_output=True, text=True, check=False)
+        if completed.returncode != 0:
+            raise RuntimeError(f"ffmpeg concat failed: {completed.stderr.strip()}")
+    finally:
+        list_path.unlink(missing_ok=True)
+    return output_path
+
+
+def load_storyboard(path: pathlib.Path) -> dict[str, list[dict[str, Any]]]:
+    """Shots grouped by branch, in file order. Lines are JSON objects or bare JSON prompt strings."""
+    branches: dict[str, list[dict[str, Any]]] = {}
+    for raw in path.read_text(encoding="utf-8").splitlines():
+        if not raw.strip() or raw.lstrip().startswith("#"):
+            continue
+        shot = json.loads(raw)
+        if isinstance(shot, str):
+            shot = {"prompt": shot}
+        branch = str(shot.pop("branch", "main"))
+        branches.setdefault(branch, []).append(shot)
+    return branches
+
+
+def run_storyboard(args: argparse.Namespace) -> None:
+    """Chain shots within each branch via last-frame handoff; run branches concurrently.
+
+    Branch videos are joined in file order into `<name>.mp4` unless --no-story-concat.
+    """
+    story_path = pathlib.Path(args.storyboard).expanduser().resolve()
+    branches = load_storyboard(story_path)
     output_dir = pathlib.Path(args.output_dir).expanduser().resolve()
     output_dir.mkdir(parents=True, exist_ok=True)
-    output_path = output_dir / f"generated_video_{timestamp}.mp4"
-    download_to_file(video_url, str(output_path))
+    attach_result_cache(args)
+    print_lock = threading.Lock()
+    print(f"[Story] {sum(len(shots) for shots in branches.values())} shots in {len(branches)} branch(es)")
+
+    def run_branch(branch: str, shots: list[dict[str, Any]]) -> pathlib.Path:
+        def log(message: str) -> None:
+            with print_lock:
+                print(f"[Story:{branch}] {message}")
+
+        videos: list[pathlib.Path] = []
+        handoff = ""
+        for index, shot in enumerate(shots, start=1):
+            shot_args = batch_line_args(args, shot, story_path.parent)
+            if handoff and not shot.get("start_image") and not shot.get("start-image"):
+                shot_args.start_image = handoff
+            started = time.monotonic()
+            plan = plan_job(shot_args, verbose=False)
+            log(f"Shot {index}/{len(shots)} -> {plan.route.model_path} (inputs ready in {plan.prepare_seconds:.2f}s)")
+            if plan.route_decision:
+                log(f"Shot {index}/{len(shots)} {plan.route_decision}")
+            output_path = output_dir / f"{story_path.stem}_{branch}_{index:02d}.mp4"
+            video = execute_plan(plan, shot_args, output_path, log=log)
+            videos.append(video)
+            log(f"Shot {index}/{len(shots)} saved: {video} ({time.monotonic() - started:.1f}s)")
+            if index < len(shots):
+                handoff = str(extract_last_frame(video, video.with_suffix(".last.png")))
+        if len(videos) == 1:
+            return videos[0]
+        combined = concat_videos(videos, output_dir / f"{story_path.stem}_{branch}.mp4")
+        log(f"Concatenated {len(videos)} shots: {combined}")
+        return combined
+
+    workers = max(1, min(args.concurrency, len(branches)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {branch: pool.submit(run_branch, branch, shots) for branch, shots in branches.items()}
+    failures = 0
+    outputs: list[pathlib.Path] = []
+    for branch, future in futures.items():
+        try:
+            outputs.append(future.result())
+            print(f"[Done] Branch {branch}: {outputs[-1]}")
+        except Exception as error:  # pylint: disable=broad-except
+            failures += 1
+            print(f"[Story:{branch}] Failed: {error}")
+    if failures:
+        raise FalClientError(f"{failures} storyboard branch(es) failed; rerun with --resume to reuse finished shots")
+    if len(outputs) > 1 and not args.no_story_concat:
+        final = concat_videos(outputs, output_dir / f"{story_path.stem}.mp4")
+        print(f"[Done] Storyboard saved: {final}")
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        run(args)
+    except KeyboardInterrupt:
+        # Pools cancel their own jobs on the way out; this covers single and storyboard waits.
+        _interrupted.set()
+        if not args.no_cancel:
+            cancel_active_requests()
+        print("[VideoGen] Interrupted")
+        sys.exit(130)
+
+
+def run(args: argparse.Namespace) -> None:
+    if args.race and args.fanout:
+        raise ValueError("--race and --fanout are mutually exclusive")
+    if args.batch:
+        run_batch(args)
+        return
+    if args.storyboard:
+        run_storyboard(args)
+        return
+    if not args.prompt:
+        raise ValueError("--prompt is required unless --batch or --storyboard is given")
+    if args.race or args.fanout:
+        run_multi(args, args.race or args.fanout, race=bool(args.race))
+        return
+
+    plan = plan_job(args)
+    attach_result_cache(args)
+    output_dir = pathlib.Path(args.output_dir).expanduser().resolve()
+    output_path = execute_plan(plan, args, output_dir / f"generated_video_{int(time.time() * 1000)}.mp4")
 
     size_mb = output_path.stat().st_size / (1024 * 1024)
     print(f"[Done] Video saved: {output_path}")